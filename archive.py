@@ -0,0 +1,186 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import zstandard
+from dotenv import load_dotenv
+
+load_dotenv()
+# --- Configuration ---
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_SEGMENT_MAX_BYTES = int(os.getenv("ARCHIVE_SEGMENT_MAX_BYTES", 256 * 1024 * 1024))
+ARCHIVE_COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", 6))
+
+# Types de pages archivées
+KIND_HELLOWORK_LISTING = "hellowork_listing"
+KIND_HELLOWORK_DETAIL = "hellowork_detail"
+KIND_FREEWORK_LISTING = "freework_listing"
+KIND_FREEWORK_DETAIL = "freework_detail"
+KIND_FRANCETRAVAIL_SEARCH = "francetravail_search"
+
+# Entrée d'index : empreinte URL (16 o), date de récupération, segment, offset, longueur
+INDEX_RECORD = struct.Struct("<16sdIQI")
+INDEX_FILENAME = "index.bin"
+
+
+def url_key(url):
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+def segment_filename(segment_id):
+    return f"segment-{segment_id:06d}.zst"
+
+
+class PageArchive:
+    """
+    Archive append-only des pages récupérées.
+    Chaque page est un frame zstd indépendant ajouté au segment courant ;
+    index.bin contient une entrée de taille fixe par page (lecture via mmap).
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, segment_max_bytes=ARCHIVE_SEGMENT_MAX_BYTES,
+                 compression_level=ARCHIVE_COMPRESSION_LEVEL):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compressor = zstandard.ZstdCompressor(level=compression_level)
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.lock = threading.Lock()
+        self.segment_id = None
+        self.segment_file = None
+        self.index_file = None
+        self.index_map = None
+        self.index_by_url = None
+        self.index_size = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Écriture ---
+    def _open_for_append(self):
+        if self.index_file is not None:
+            return
+        self.index_file = open(os.path.join(self.directory, INDEX_FILENAME), "ab")
+        segments = sorted(f for f in os.listdir(self.directory) if f.startswith("segment-"))
+        self.segment_id = int(segments[-1][8:14]) if segments else 1
+        self._open_segment()
+
+    def _open_segment(self):
+        if self.segment_file is not None:
+            self.segment_file.close()
+        path = os.path.join(self.directory, segment_filename(self.segment_id))
+        self.segment_file = open(path, "ab")
+
+    def append(self, kind, url, body, fetched_at=None, meta=None):
+        if fetched_at is None:
+            fetched_at = time.time()
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        header = {"kind": kind, "url": url, "fetchedAt": fetched_at}
+        if meta:
+            header["meta"] = meta
+        payload = json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n" + body
+        frame = self.compressor.compress(payload)
+        with self.lock:
+            self._open_for_append()
+            if self.segment_file.tell() > 0 and self.segment_file.tell() + len(frame) > self.segment_max_bytes:
+                self.segment_id += 1
+                self._open_segment()
+            offset = self.segment_file.tell()
+            self.segment_file.write(frame)
+            self.segment_file.flush()
+            # L'entrée d'index n'est écrite qu'une fois le frame sur disque
+            self.index_file.write(INDEX_RECORD.pack(url_key(url), fetched_at, self.segment_id, offset, len(frame)))
+            self.index_file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.segment_file is not None:
+                self.segment_file.close()
+                self.segment_file = None
+            if self.index_file is not None:
+                self.index_file.close()
+                self.index_file = None
+            if self.index_map is not None:
+                self.index_map.close()
+                self.index_map = None
+            self.index_by_url = None
+
+    # --- Lecture ---
+    def _map_index(self):
+        path = os.path.join(self.directory, INDEX_FILENAME)
+        if not os.path.exists(path) or os.path.getsize(path) < INDEX_RECORD.size:
+            return None
+        size = os.path.getsize(path) - os.path.getsize(path) % INDEX_RECORD.size
+        if self.index_map is None or size != self.index_size:
+            if self.index_map is not None:
+                self.index_map.close()
+            with open(path, "rb") as f:
+                self.index_map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self.index_size = size
+            self.index_by_url = None
+        return self.index_map
+
+    def entries(self):
+        index_map = self._map_index()
+        if index_map is None:
+            return
+        yield from INDEX_RECORD.iter_unpack(index_map)
+
+    def read_entry(self, segment_id, offset, length):
+        with open(os.path.join(self.directory, segment_filename(segment_id)), "rb") as f:
+            f.seek(offset)
+            frame = f.read(length)
+        header, _, body = self.decompressor.decompress(frame).partition(b"\n")
+        return json.loads(header), body
+
+    def records(self, kinds=None, since=None):
+        for _, fetched_at, segment_id, offset, length in self.entries():
+            if since is not None and fetched_at < since:
+                continue
+            header, body = self.read_entry(segment_id, offset, length)
+            if kinds is None or header["kind"] in kinds:
+                yield header, body
+
+    def lookup(self, url, before=None):
+        """Retourne (en-tête, contenu) de la capture la plus récente de l'URL (antérieure à `before` si précisé)."""
+        if self._map_index() is None:
+            return None
+        if self.index_by_url is None:
+            self.index_by_url = {}
+            for key, fetched_at, segment_id, offset, length in self.entries():
+                self.index_by_url.setdefault(key, []).append((fetched_at, segment_id, offset, length))
+        best = None
+        for entry in self.index_by_url.get(url_key(url), []):
+            if before is not None and entry[0] > before:
+                continue
+            if best is None or entry[0] >= best[0]:
+                best = entry
+        if best is None:
+            return None
+        return self.read_entry(*best[1:])
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    global _archive
+    if not ARCHIVE_DIR:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = PageArchive(ARCHIVE_DIR)
+        return _archive
+
+
+def archive_page(kind, url, body, meta=None):
+    archive = get_archive()
+    if archive is None:
+        return
+    try:
+        archive.append(kind, url, body, meta=meta)
+    except Exception as e:
+        print(f"⚠️ Erreur archivage ({url}): {e}")
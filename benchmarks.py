@@ -0,0 +1,139 @@
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# --- Configuration ---
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", 500))
+STARTUP_RUNS = int(os.getenv("STARTUP_RUNS", 5))
+BROWSER_MODULES = ("selenium", "webdriver_manager", "bs4")
+SEARCH_BENCH_OFFERS = int(os.getenv("SEARCH_BENCH_OFFERS", 20000))
+SEARCH_P95_BUDGET_MS = float(os.getenv("SEARCH_P95_BUDGET_MS", 10))
+
+# Chemin d'une commande `francetravail` jusqu'au lancement de la collecte (sans réseau)
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import cli
+args = cli.build_parser().parse_args(["francetravail"])
+import index
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (BROWSER_MODULES,)
+
+
+def bench_startup(runs=STARTUP_RUNS, budget_ms=STARTUP_BUDGET_MS):
+    """Mesure le démarrage de la commande francetravail dans un interpréteur neuf."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        loaded.update(result["loaded"])
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"⏱️ Démarrage francetravail : médiane {median:.0f} ms, min {timings[0]:.0f} ms (budget {budget_ms:.0f} ms)")
+    ok = True
+    if loaded:
+        print(f"❌ Modules navigateur chargés au démarrage : {', '.join(sorted(loaded))}")
+        ok = False
+    if median > budget_ms:
+        print(f"❌ Budget de démarrage dépassé ({median:.0f} ms > {budget_ms:.0f} ms)")
+        ok = False
+    return ok
+
+
+def bench_search(offers=SEARCH_BENCH_OFFERS, queries=200, budget_ms=SEARCH_P95_BUDGET_MS):
+    """Latence de l'index de recherche sur un corpus synthétique d'offres."""
+    import random
+    from search import OfferIndex
+    rng = random.Random(42)
+    # Vocabulaire à distribution de Zipf, comme un texte réel : quelques termes très fréquents, beaucoup de rares
+    common = ("développeur python java data ingénieur commercial vendeuse comptable cariste infirmier "
+              "logistique agile docker cloud réseau maintenance électricien cuisinier chauffeur assistant "
+              "gestion projet client marketing analyste sécurité technicien support paie conseiller").split()
+    words = common + [f"terme{i}" for i in range(5000)]
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    sites = ("HelloWork", "FreeWork", "France Travail")
+    contrats = ("CDI", "CDD", "Intérim", "Freelance")
+    villes = ("Paris", "Lyon", "Marseille", "Lille", "Nantes", "Bordeaux", "Toulouse")
+    index = OfferIndex()
+    start = time.perf_counter()
+    for i in range(offers):
+        index.add({
+            "idOffre": str(i),
+            "titre": " ".join(rng.choices(words, cum_weights=weights, k=4)),
+            "mission": " ".join(rng.choices(words, cum_weights=weights, k=80)),
+            "profilRecherche": " ".join(rng.choices(words, cum_weights=weights, k=25)),
+            "site": rng.choice(sites),
+            "typeContrat": rng.choice(contrats),
+            "localisation": rng.choice(villes),
+        })
+    print(f"📚 Index de {offers} offres construit en {time.perf_counter() - start:.1f} s")
+    timings = []
+    for _ in range(queries):
+        query = " ".join(rng.choices(words, cum_weights=weights, k=rng.randint(1, 3)))
+        filters = {"site": rng.choice(sites)} if rng.random() < 0.5 else {}
+        start = time.perf_counter()
+        index.search(query, limit=20, **filters)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p50, p95, p99 = (timings[int(len(timings) * q) - 1] for q in (0.5, 0.95, 0.99))
+    print(f"⏱️ Recherche : p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms (budget p95 {budget_ms:.0f} ms)")
+    if p95 > budget_ms:
+        print(f"❌ Budget de latence dépassé ({p95:.2f} ms > {budget_ms:.0f} ms)")
+        return False
+    return True
+
+
+def check_breaker_known_offers(timeout_s=3.0):
+    """Régression : une offre déjà en base ne doit pas prendre (et garder) le test de reprise du disjoncteur."""
+    import threading
+    import index
+    from offers import JobOffer
+    from retry import CircuitBreaker
+
+    class KnownOffers:
+        def find_one(self, query):
+            return {"_id": query}
+
+    breaker = CircuitBreaker("regression", failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    for number in range(3):
+        offer = JobOffer(site="HelloWork", idOffre=f"HW{number}", lien=f"https://example.invalid/emplois/{number}.html")
+        index.extract_hellowork_job_info(offer, None, KnownOffers(), breaker=breaker)
+        index.extract_freework_job_info(f"https://example.invalid/job-mission/{number}", None, 1, number, KnownOffers(), breaker=breaker)
+    # Disjoncteur demi-ouvert : le test de reprise doit rester disponible pour la prochaine vraie requête
+    waiter = threading.Thread(target=breaker.wait, daemon=True)
+    waiter.start()
+    waiter.join(timeout_s)
+    if waiter.is_alive():
+        print(f"❌ Disjoncteur bloqué après des offres déjà en base (état {breaker.state})")
+        return False
+    print("✅ Disjoncteur libre après des offres déjà en base")
+    return True
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "search": bench_search,
+    "breaker": check_breaker_known_offers,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    results = {}
+    for name in selected:
+        start = time.perf_counter()
+        results[name] = BENCHMARKS[name]()
+        print(f"   ({name} : {time.perf_counter() - start:.1f} s)")
+    sys.exit(0 if all(results.values()) else 1)
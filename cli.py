@@ -0,0 +1,209 @@
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Les modules de scraping (et leurs dépendances) sont importés dans chaque commande,
+# pour qu'une commande ne charge que ce dont sa source a besoin.
+
+
+def cmd_francetravail(args):
+    import index
+    mongo_collection = index.init_mongodb(index.MONGODB_URI, index.DB_NAME, index.COLLECTION_NAME)
+    index.scrape_francetravail(
+        index.FRANCETRAVAIL_CLIENT_ID,
+        index.FRANCETRAVAIL_CLIENT_SECRET,
+        mongo_collection,
+        min_creation_date=args.min_date,
+        max_creation_date=args.max_date,
+    )
+
+
+def cmd_hellowork(args):
+    import index
+    start_page, end_page = page_range(args, index)
+    index.scrape_hellowork(start_page, end_page, max_jobs_per_page(args, index), workers=listing_workers(args, index))
+
+
+def cmd_freework(args):
+    import index
+    start_page, end_page = page_range(args, index)
+    index.scrape_freework(start_page, end_page, workers=listing_workers(args, index))
+
+
+def cmd_all(args):
+    import index
+    start_page, end_page = page_range(args, index)
+    index.run_scraping(args.sources, start_page, end_page, max_jobs_per_page(args, index), listing_workers(args, index))
+
+
+def cmd_replay(args):
+    import index
+    since = (datetime.now(timezone.utc) - timedelta(days=args.since_days)).timestamp() if args.since_days else None
+    index.run_replay(kinds=args.kinds, since=since)
+
+
+def cmd_cv_generate(args):
+    import cv
+    cv.check_mongodb_connections()
+    since = datetime.now(timezone.utc) - timedelta(days=args.since_days) if args.since_days else None
+    offers = cv.get_offers(since=since, site=args.site)
+    cv.process_offers(offers, limit=args.limit, stream=not args.no_stream)
+
+
+def cmd_match(args):
+    import json
+    import time
+    import cv
+    from skills import match_cvs_to_offers
+    since = datetime.now(timezone.utc) - timedelta(days=args.since_days) if args.since_days else None
+    query = {"datePublication": {"$gte": since}} if since else {}
+    projection = {"idOffre": 1, "titre": 1, "mission": 1, "profilRecherche": 1, "skills": 1}
+    offers = list(cv.get_offers_collection().find(query, projection))
+    cvs = list(cv.get_cv_collection().find({}, {"userId": 1, "basics": 1, "skills": 1, "work.position": 1}))
+    start = time.perf_counter()
+    results = match_cvs_to_offers(cvs, offers, k=args.top_k)
+    print(f"✅ {len(cvs)} CVs x {len(offers)} offres appariés en {time.perf_counter() - start:.2f} s")
+    with open(args.output, "w", encoding="utf-8") as f:
+        for resume, matches in results:
+            f.write(json.dumps({
+                "userId": resume.get("userId"),
+                "offers": [{"idOffre": offer.get("idOffre"), "titre": offer.get("titre"), "score": round(score, 4)} for offer, score in matches],
+            }, ensure_ascii=False) + "\n")
+    print(f"📄 Résultats écrits dans {args.output}")
+
+
+def cmd_skills_backfill(args):
+    import cv
+    from skills import backfill_offer_skills
+    backfill_offer_skills(cv.get_offers_collection())
+
+
+def cmd_daemon(args):
+    import scheduler
+    scheduler.run_daemon(
+        sources=args.sources,
+        generate_cvs=not args.no_cv,
+        max_concurrent=args.max_concurrent,
+        fresh_pages=args.fresh_pages,
+        fresh_minutes=args.fresh_minutes,
+        francetravail_minutes=args.francetravail_minutes,
+        deep_at=args.deep_at,
+        workers=args.workers,
+    )
+
+
+def cmd_search_serve(args):
+    import cv
+    import search
+    search.serve(cv.get_offers_collection(), host=args.host, port=args.port)
+
+
+def cmd_export(args):
+    import cv
+    from export import export_collection
+    collections = {"offers": cv.get_offers_collection, "cvs": cv.get_cv_collection}
+    for name in args.collections:
+        export_collection(collections[name](), name, formats=args.formats, output_dir=args.output_dir,
+                          incremental=not args.full)
+
+
+def add_page_range(parser):
+    # Par défaut : START_PAGE / END_PAGE du .env, lus par index.py
+    parser.add_argument("--start-page", type=int, default=None)
+    parser.add_argument("--end-page", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Navigateurs en parallèle par site (LISTING_WORKERS)")
+
+
+def page_range(args, index):
+    start_page = index.START_PAGE if args.start_page is None else args.start_page
+    end_page = index.END_PAGE if args.end_page is None else args.end_page
+    return start_page, end_page
+
+
+def listing_workers(args, index):
+    return index.LISTING_WORKERS if args.workers is None else args.workers
+
+
+def max_jobs_per_page(args, index):
+    return index.MAX_JOBS_PER_PAGE if args.max_jobs_per_page is None else args.max_jobs_per_page
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="scrapemploi", description="Collecte d'offres d'emploi et génération de CVs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("francetravail", help="Récupère les offres via l'API France Travail")
+    p.add_argument("--min-date", help="Date de création minimale (AAAA-MM-JJ), 30 jours par défaut")
+    p.add_argument("--max-date", help="Date de création maximale (AAAA-MM-JJ), aujourd'hui par défaut")
+    p.set_defaults(func=cmd_francetravail)
+
+    p = subparsers.add_parser("hellowork", help="Scrape les pages de liste HelloWork")
+    add_page_range(p)
+    p.add_argument("--max-jobs-per-page", type=int, default=None)
+    p.set_defaults(func=cmd_hellowork)
+
+    p = subparsers.add_parser("freework", help="Scrape les pages de liste FreeWork")
+    add_page_range(p)
+    p.set_defaults(func=cmd_freework)
+
+    p = subparsers.add_parser("all", help="Lance plusieurs sources en parallèle (un thread par source)")
+    p.add_argument("--sources", nargs="+", choices=["hellowork", "francetravail", "freework"],
+                   default=["hellowork", "francetravail", "freework"])
+    add_page_range(p)
+    p.add_argument("--max-jobs-per-page", type=int, default=None)
+    p.set_defaults(func=cmd_all)
+
+    p = subparsers.add_parser("replay", help="Ré-extrait les offres depuis l'archive de pages, sans réseau")
+    p.add_argument("--kinds", nargs="+", default=None, help="Types de pages à rejouer (ex: hellowork_listing)")
+    p.add_argument("--since-days", type=float, default=None)
+    p.set_defaults(func=cmd_replay)
+
+    p = subparsers.add_parser("cv-generate", help="Génère des CVs adaptés aux offres stockées")
+    p.add_argument("--limit", type=int, default=4000)
+    p.add_argument("--since-days", type=float, default=None, help="Seulement les offres publiées depuis N jours")
+    p.add_argument("--site", default=None)
+    p.add_argument("--no-stream", action="store_true", help="Attend la réponse complète au lieu du flux")
+    p.set_defaults(func=cmd_cv_generate)
+
+    p = subparsers.add_parser("match", help="Apparie tous les CVs aux offres (top-k par compétences)")
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--since-days", type=float, default=None, help="Seulement les offres publiées depuis N jours")
+    p.add_argument("--output", default="matches.jsonl")
+    p.set_defaults(func=cmd_match)
+
+    p = subparsers.add_parser("search-serve", help="Service HTTP local de recherche plein texte sur les offres")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.set_defaults(func=cmd_search_serve)
+
+    p = subparsers.add_parser("export", help="Exporte offres et CVs en Parquet / Arrow IPC / NDJSON")
+    p.add_argument("--collections", nargs="+", choices=["offers", "cvs"], default=["offers", "cvs"])
+    p.add_argument("--formats", nargs="+", choices=["parquet", "arrow", "ndjson"], default=["parquet"])
+    p.add_argument("--output-dir", default="exports")
+    p.add_argument("--full", action="store_true", help="Ignore le watermark et exporte tout")
+    p.set_defaults(func=cmd_export)
+
+    p = subparsers.add_parser("skills-backfill", help="Renseigne les compétences des offres déjà en base")
+    p.set_defaults(func=cmd_skills_backfill)
+
+    p = subparsers.add_parser("daemon", help="Collecte en continu selon un planning par source, navigateurs gardés ouverts")
+    p.add_argument("--sources", nargs="+", choices=["hellowork", "francetravail", "freework"],
+                   default=["hellowork", "francetravail", "freework"])
+    p.add_argument("--fresh-pages", type=int, default=5, help="Pages de liste récentes revisitées fréquemment")
+    p.add_argument("--fresh-minutes", type=float, default=5, help="Intervalle des pages récentes")
+    p.add_argument("--francetravail-minutes", type=float, default=15)
+    p.add_argument("--deep-at", default="02:00", help="Heure (HH:MM) du parcours nocturne des pages profondes")
+    p.add_argument("--max-concurrent", type=int, default=4, help="Collectes simultanées au maximum")
+    p.add_argument("--workers", type=int, default=None, help="Workers de liste par collecte")
+    p.add_argument("--no-cv", action="store_true", help="Ne pas générer les CVs des nouvelles offres")
+    p.set_defaults(func=cmd_daemon)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,220 @@
+import queue
+import re
+import threading
+import time
+
+from retry import CircuitBreaker, RetryQueue
+
+# Résultat du traitement d'une page de liste
+PAGE_OK = "ok"
+PAGE_EMPTY = "empty"
+PAGE_FAILED = "failed"
+
+
+# Conteneurs de pagination, du plus spécifique au plus générique
+PAGINATION_SELECTORS = ("[aria-label*='agination']", "[class*='pagination']", "[class*='pager']", "nav")
+NEXT_LINK_PATTERN = re.compile(r"suivant|next|›|→", re.IGNORECASE)
+LAST_LINK_PATTERN = re.compile(r"derni[eè]re|last|»", re.IGNORECASE)
+ELLIPSIS_PATTERN = re.compile(r"…|\.\.\.")
+
+
+def _last_page_in(container, links):
+    numbered, last, following = [], [], []
+    for number, link in links:
+        label = " ".join((link.get_text(" ", strip=True), link.get("aria-label", ""), link.get("title", ""),
+                          " ".join(link.get("rel") or [])))
+        if LAST_LINK_PATTERN.search(label):
+            last.append(number)
+        elif NEXT_LINK_PATTERN.search(label):
+            following.append(number)
+        elif link.get_text(strip=True).isdigit():
+            numbered.append((number, link))
+    if last:
+        return max(last)
+    if not numbered:
+        return None
+    highest, highest_link = max(numbered, key=lambda item: item[0])
+    # Page la plus haute atteinte seulement via « suivant » : le total n'est pas affiché
+    if following and max(following) > highest:
+        return None
+    # Fenêtre de numéros tronquée (« 1 2 3 … suivant ») sans lien vers la dernière page
+    if any(container in text.parents for text in highest_link.find_all_next(string=ELLIPSIS_PATTERN)):
+        return None
+    return highest
+
+
+def parse_last_page(html, page_param):
+    """
+    Numéro de la dernière page d'après le bloc de pagination (?page=N), None si introuvable
+    ou incertain : seule la page suivante est liée, ou les numéros s'arrêtent sur « … ».
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    link_pattern = re.compile(rf"[?&;]{re.escape(page_param)}=(\d+)")
+    for selector in PAGINATION_SELECTORS:
+        for container in soup.select(selector):
+            links = [(int(match.group(1)), link) for link in container.find_all("a", href=True)
+                     if (match := link_pattern.search(link["href"]))]
+            if links:
+                return _last_page_in(container, links)
+    return None
+
+
+def split_page_range(start_page, end_page, shard_size):
+    return [(first, min(first + shard_size - 1, end_page)) for first in range(start_page, end_page + 1, shard_size)]
+
+
+class CrawlStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.empty_pages = []
+        self.failed_pages = []
+
+    def add(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                self.counts[key] = self.counts.get(key, 0) + value
+
+    def get(self, key):
+        return self.counts.get(key, 0)
+
+
+def crawl_pages(name, start_page, end_page, workers, open_worker, close_worker, crawl_page,
+                shard_size=10, last_page_known=True, stats=None, retries=None, breaker=None, crawl_retry=None, on_drop=None):
+    """
+    Répartit [start_page, end_page] en tranches traitées par `workers` threads indépendants.
+    open_worker() crée l'état d'un worker (ex: un navigateur), crawl_page(state, page) retourne
+    PAGE_OK / PAGE_EMPTY / PAGE_FAILED. Les pages en échec partent dans la file de reprise
+    différée `retries` ; les autres éléments de cette file ("detail", ...) sont passés à
+    crawl_retry(state, item), qui retourne True en cas de succès, et on_drop(item) est appelé
+    quand un élément est abandonné. Une page vide n'arrête le parcours que si la dernière page
+    est inconnue. close_worker(state) rend l'état ; après un échec, le worker le rend avec
+    close_worker(state, True) (navigateur à vérifier) et en reprend un.
+    """
+    stats = stats or CrawlStats()
+    if retries is None:
+        retries = RetryQueue(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name)
+    shards = queue.Queue()
+    if end_page >= start_page:
+        for first, last in split_page_range(start_page, end_page, shard_size):
+            shards.put((first, last))
+    # Éléments en cours de traitement : ils peuvent encore programmer des reprises
+    in_flight = [0]
+    # Sans pagination connue, la première page vide marque la fin du site
+    stop_page = [end_page]
+
+    def run_page(state, worker_id, page_num, attempt):
+        breaker.wait()
+        try:
+            status = crawl_page(state, page_num)
+        except Exception as e:
+            print(f"❌ [{name} #{worker_id}] Erreur page {page_num}: {e}")
+            status = PAGE_FAILED
+        if status == PAGE_OK:
+            breaker.record_success()
+            stats.add(pages_ok=1)
+        elif status == PAGE_EMPTY:
+            breaker.record_success()
+            stats.add(pages_empty=1)
+            with stats.lock:
+                stats.empty_pages.append(page_num)
+                if not last_page_known:
+                    stop_page[0] = min(stop_page[0], page_num - 1)
+        else:
+            breaker.record_failure()
+            if not retries.push(("page", page_num), attempt):
+                stats.add(pages_failed=1)
+                with stats.lock:
+                    stats.failed_pages.append(page_num)
+        return status
+
+    def run_retry(state, worker_id, attempt, item):
+        kind, payload = item
+        if kind == "page":
+            return run_page(state, worker_id, payload, attempt) != PAGE_FAILED
+        breaker.wait()
+        try:
+            ok = crawl_retry(state, item)
+        except Exception as e:
+            print(f"❌ [{name} #{worker_id}] Erreur reprise {kind}: {e}")
+            ok = False
+        if ok:
+            breaker.record_success()
+            retries.metrics.add(name, "recovered")
+        else:
+            breaker.record_failure()
+            if not retries.push(item, attempt) and on_drop is not None:
+                on_drop(item)
+        return ok
+
+    def next_task():
+        with stats.lock:
+            due = retries.pop_due()
+            if due is not None:
+                in_flight[0] += 1
+                return "retry", due
+            try:
+                shard = shards.get_nowait()
+            except queue.Empty:
+                if in_flight[0] == 0 and len(retries) == 0:
+                    return "done", None
+                return "wait", None
+            in_flight[0] += 1
+            return "shard", shard
+
+    def reopen(state, worker_id):
+        # Navigateur peut-être hors d'usage (plantage, session expirée) : rendu pour vérification
+        close_worker(state, True)
+        try:
+            return open_worker()
+        except Exception as e:
+            print(f"❌ [{name} #{worker_id}] Impossible de redémarrer le worker: {e}")
+            return None
+
+    def worker(worker_id):
+        try:
+            state = open_worker()
+        except Exception as e:
+            print(f"❌ [{name} #{worker_id}] Impossible de démarrer le worker: {e}")
+            return
+        try:
+            while True:
+                task, value = next_task()
+                if task == "done":
+                    return
+                if task == "wait":
+                    delay = retries.seconds_until_next()
+                    time.sleep(min(1.0, delay) if delay is not None else 0.5)
+                    continue
+                try:
+                    if task == "retry":
+                        attempt, item = value
+                        if not run_retry(state, worker_id, attempt, item):
+                            state = reopen(state, worker_id)
+                    else:
+                        first, last = value
+                        for page_num in range(first, last + 1):
+                            if page_num > stop_page[0]:
+                                break
+                            if run_page(state, worker_id, page_num, 0) == PAGE_FAILED:
+                                state = reopen(state, worker_id)
+                                if state is None:
+                                    break
+                finally:
+                    with stats.lock:
+                        in_flight[0] -= 1
+                if state is None:
+                    return
+        finally:
+            if state is not None:
+                close_worker(state)
+
+    threads = [threading.Thread(target=worker, args=(i + 1,), name=f"{name}-{i + 1}") for i in range(max(1, workers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
@@ -1,20 +1,24 @@
 import os
-import re
 import time
 import uuid
 
-import pymongo
 import requests
 import json
 from dotenv import load_dotenv
-from pymongo import MongoClient
 from bson import ObjectId
 from typing import List, Dict, Any
 
+from indexes import ensure_cv_indexes, ensure_offer_indexes
+from json_repair import ObjectStream, defect_report, parse_objects
+from mongo_clients import get_collection, ping
+from skills import extract_offer_skills
+
 load_dotenv()
 
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 MISTRAL_API_URL = os.getenv("MISTRAL_API_URL")
+# Pause avant chaque appel (limite de débit de l'API)
+MISTRAL_CALL_DELAY = float(os.getenv("MISTRAL_CALL_DELAY", 5))
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME")
 COLLECTION_NAME_OFFERS = os.getenv("COLLECTION_NAME", "job_offers")
@@ -22,46 +26,36 @@ COLLECTION_NAME_CVS = os.getenv("COLLECTION_CV", "resume")
 MONGO_CV = os.getenv("MONGO_CV")
 DB_CV = os.getenv("DB_CV")
 COLLECTION_CV = os.getenv("COLLECTION_CV")
-# Connexion à MongoDB
-client = MongoClient(MONGODB_URI)
-db = client[DB_NAME]
-offers_collection = db[COLLECTION_NAME_OFFERS]
-cv_collection = db[COLLECTION_NAME_CVS]
+# Génération en flux : chaque CV est enregistré dès que son objet JSON est complet
+MISTRAL_STREAM = os.getenv("MISTRAL_STREAM", "true").lower() in ("1", "true", "yes")
+# Connexions MongoDB partagées, ouvertes au premier usage
+def get_offers_collection():
+    return get_collection(MONGODB_URI, DB_NAME, COLLECTION_NAME_OFFERS)
+
+def get_cv_collection():
+    return get_collection(MONGO_CV or MONGODB_URI, DB_CV or DB_NAME, COLLECTION_CV or COLLECTION_NAME_CVS)
 
 def check_mongodb_connections():
     try:
         # --- Connexion à service-job (offres) ---
         print("🔍 Vérification de la connexion à 'service-job'...")
-        offers_client = MongoClient(MONGODB_URI)
-        offers_client.server_info()  # Test de connexion
-        offers_db = offers_client[DB_NAME]
-        offers_collection = offers_db[COLLECTION_NAME_OFFERS]
+        ping(MONGODB_URI)
+        offers_collection = get_offers_collection()
         print(f"✅ Connexion OK à 'service-job' (Base: {DB_NAME}, Collection: {COLLECTION_NAME_OFFERS})")
 
         # --- Connexion à service-profile (CVs) ---
         print("\n🔍 Vérification de la connexion à 'service-profile'...")
-        cv_client = MongoClient(MONGO_CV)
-        cv_client.server_info()  # Test de connexion
-        cv_db = cv_client[DB_CV]
-        cv_collection = cv_db[COLLECTION_CV]
-        print(f"✅ Connexion OK à 'service-profile' (Base: {DB_CV}, Collection: {COLLECTION_CV})")
-
-        # --- Test d'insertion dans les deux collections ---
-        # Test dans job_offers
-        test_offer = {"test": "test_offer", "from": "connection_check"}
-        offer_result = offers_collection.insert_one(test_offer)
-        print(f"✅ Test INSERT OK dans 'job_offers' (ID: {offer_result.inserted_id})")
-        offers_collection.delete_one({"_id": offer_result.inserted_id})  # Nettoyage
-
-        # Test dans resume
-        test_cv = {"test": "test_cv", "from": "connection_check"}
-        cv_result = cv_collection.insert_one(test_cv)
-        print(f"✅ Test INSERT OK dans 'resume' (ID: {cv_result.inserted_id})")
-        cv_collection.delete_one({"_id": cv_result.inserted_id})  # Nettoyage
-
-        # --- Affichage des compteurs ---
-        offers_count = offers_collection.count_documents({})
-        cv_count = cv_collection.count_documents({})
+        ping(MONGO_CV or MONGODB_URI)
+        cv_collection = get_cv_collection()
+        print(f"✅ Connexion OK à 'service-profile' (Base: {cv_collection.database.name}, Collection: {cv_collection.name})")
+
+        # --- Index requis (création idempotente + vérification des plans) ---
+        ensure_offer_indexes(offers_collection)
+        ensure_cv_indexes(cv_collection)
+
+        # --- Affichage des compteurs (métadonnées, sans parcours de collection) ---
+        offers_count = offers_collection.estimated_document_count()
+        cv_count = cv_collection.estimated_document_count()
         print(f"\n📊 **Offres disponibles** : {offers_count}")
         print(f"📊 **CVs existants** : {cv_count}")
 
@@ -86,7 +80,7 @@ def call_mistral_api(prompt: str, max_tokens: int = 2000, temperature: float = 0
     }
     try:
         # Augmenter le délai entre les appels
-        time.sleep(5)
+        time.sleep(MISTRAL_CALL_DELAY)
         response = requests.post(MISTRAL_API_URL, headers=headers, json=data, timeout=60)
         if response.status_code != 200:
             if log_func:
@@ -108,20 +102,77 @@ def call_mistral_api(prompt: str, max_tokens: int = 2000, temperature: float = 0
             log_func(f"Erreur Mistral: {e}", "error")
         return ""
 
-def get_offers(start_page=1, end_page=5000, max_jobs_per_page=None):
+
+def stream_mistral_api(prompt: str, max_tokens: int = 2000, temperature: float = 0.7, log_func=None):
+    """
+    Appel en flux (server-sent events) : produit des couples (texte reçu, finish_reason)
+    au fil de la génération. finish_reason vaut "length" si la réponse est coupée à max_tokens.
+    """
+    headers = {
+        "Authorization": f"Bearer {MISTRAL_API_KEY}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream"
+    }
+    data = {
+        "model": "mistral-tiny",
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stream": True
+    }
+    try:
+        time.sleep(MISTRAL_CALL_DELAY)
+        with requests.post(MISTRAL_API_URL, headers=headers, json=data, timeout=60, stream=True) as response:
+            if response.status_code != 200:
+                if log_func:
+                    log_func(f"Erreur API Mistral: {response.status_code} - {response.text}", "error")
+                return
+            # SSE est en UTF-8 ; sans charset dans Content-Type, requests décoderait en ISO-8859-1
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    return
+                event = json.loads(payload)
+                for choice in event.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content") or ""
+                    if delta or choice.get("finish_reason"):
+                        yield delta, choice.get("finish_reason")
+    except requests.exceptions.Timeout:
+        # Les CVs déjà reçus restent exploitables
+        if log_func:
+            log_func("Timeout lors de l'appel à l'API Mistral", "error")
+    except Exception as e:
+        if log_func:
+            log_func(f"Erreur Mistral: {e}", "error")
+
+def get_offers(start_page=1, end_page=5000, max_jobs_per_page=None, since=None, until=None, site=None):
     try:
-        total_offers = offers_collection.count_documents({})
+        # datePublication est une date BSON : filtre par intervalle servi par l'index (site, datePublication)
+        query = {}
+        if since is not None or until is not None:
+            query["datePublication"] = {}
+            if since is not None:
+                query["datePublication"]["$gte"] = since
+            if until is not None:
+                query["datePublication"]["$lt"] = until
+        if site is not None:
+            query["site"] = site
+        offers_collection = get_offers_collection()
+        total_offers = offers_collection.count_documents(query)
         print(f"Nombre total d'offres : {total_offers}")
 
         if max_jobs_per_page is None:
-            offers = list(offers_collection.find({}))
+            offers = list(offers_collection.find(query))
             print(f"Récupéré {len(offers)} offres.")
             return offers
 
         offers = []
         for page in range(start_page, end_page + 1):
             skip = (page - 1) * max_jobs_per_page
-            page_offers = list(offers_collection.find({}).skip(skip).limit(max_jobs_per_page))
+            page_offers = list(offers_collection.find(query).skip(skip).limit(max_jobs_per_page))
             offers.extend(page_offers)
             print(f"Récupéré {len(page_offers)} offres pour la page {page}.")
 
@@ -149,35 +200,9 @@ def convert_objectid_to_str(data: Dict[str, Any]) -> Dict[str, Any]:
         return data
 
 def extract_json_from_response(resp: str) -> List[Dict[str, Any]]:
-    if not resp:
-        return []
-    # Nettoyer les blocs ```json
-    json_pattern = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
-    matches = json_pattern.findall(resp)
-    all_cvs = []
-    for idx, match in enumerate(matches):
-        json_str = match.strip()  # Nettoyer les espaces
-        try:
-            data = json.loads(json_str)
-            if isinstance(data, list):
-                all_cvs.extend(data)
-            elif isinstance(data, dict):
-                all_cvs.append(data)
-        except json.JSONDecodeError as e:
-            print(f"Erreur de parsing (bloc {idx+1}): {e}")
-            print(f"Contenu problématique: '{json_str[:100]}...'")
-            continue
-    # Si aucun bloc ```json, essayer de parser directement la réponse
-    if not all_cvs:
-        try:
-            data = json.loads(resp)
-            if isinstance(data, list):
-                all_cvs.extend(data)
-            elif isinstance(data, dict):
-                all_cvs.append(data)
-        except json.JSONDecodeError:
-            pass
-    return all_cvs
+    # Réparation tolérante (virgules doublées/finales, troncature, prose entre blocs) :
+    # les CVs valides d'un tableau cassé sont récupérés un par un
+    return parse_objects(resp)
 
 def is_valid_cv(cv: Dict) -> bool:
     required_fields = ["userId", "basics"]
@@ -188,11 +213,7 @@ def is_valid_cv(cv: Dict) -> bool:
         return False
     return True
 
-def generate_adapted_cvs(offer: Dict[str, Any], log_func=None) -> List[Dict[str, Any]]:
-    """
-    Génère 3 CVs adaptés à l'offre d'emploi.
-    Retourne une liste de dictionnaires structurés.
-    """
+def build_cv_prompt(offer: Dict[str, Any]) -> str:
     offer_str = convert_objectid_to_str(offer)
 
     # Extraire les informations clés de l'offre
@@ -200,7 +221,7 @@ def generate_adapted_cvs(offer: Dict[str, Any], log_func=None) -> List[Dict[str,
     mission  = offer_str.get("mission", "")
     profil = offer_str.get("profilRecherche", "")
     profilRecherche = offer_str.get("profilRecherche")
-    offer_skills = offer_str.get("skills", [])
+    offer_skills = offer_str.get("skills") or extract_offer_skills(offer_str)
     print(f"🔍 OFFRE: '{titre}' | Mission: {len(mission)}c | Profil: {len(profil)}c")
     prompt = f"""RETOURNE **UNIQUEMENT** 3 CVs JSON strict valides sans texte ni avant ni après séparés par `````` pour:
 
@@ -255,7 +276,7 @@ Génère 3 CVs UNIQUES  sous forme de tableau JSON (junior, intermédiaire, seni
     "domain": "Tech"
 }},
 {{
-    "userId": "{uuid.uuid4()}",,
+    "userId": "{uuid.uuid4()}",
     "basics": {{
         "name": "Prénom Nom",
         "label": "Titre du poste",
@@ -290,7 +311,7 @@ Génère 3 CVs UNIQUES  sous forme de tableau JSON (junior, intermédiaire, seni
     "domain": "domaine"
 }},
 {{
-    "userId": "{uuid.uuid4()}",,
+    "userId": "{uuid.uuid4()}",
     "basics": {{
         "name": "Prénom Nom",
         "label": "Titre du poste",
@@ -328,9 +349,15 @@ Génère 3 CVs UNIQUES  sous forme de tableau JSON (junior, intermédiaire, seni
 ```
 **
 Crée CV1 (junior), CV2 (intermédiaire), CV3 (senior) en suivant ce format."""
+    return prompt
 
 
-
+def generate_adapted_cvs(offer: Dict[str, Any], log_func=None) -> List[Dict[str, Any]]:
+    """
+    Génère 3 CVs adaptés à l'offre d'emploi.
+    Retourne une liste de dictionnaires structurés.
+    """
+    prompt = build_cv_prompt(offer)
     print("→ Appel à l'API Mistral...")
     resp = call_mistral_api(prompt, max_tokens=4000, temperature=0.7, log_func=log_func)
 
@@ -343,27 +370,61 @@ Crée CV1 (junior), CV2 (intermédiaire), CV3 (senior) en suivant ce format."""
 
     # Parser la réponse
     cvs = extract_json_from_response(resp)
+    return cvs
 
 
-
-
+def stream_adapted_cvs(offer: Dict[str, Any], on_cv, log_func=None) -> List[Dict[str, Any]]:
+    """
+    Variante en flux de generate_adapted_cvs : chaque CV est validé et transmis à `on_cv`
+    dès que son accolade fermante est reçue. Une génération coupée à max_tokens
+    conserve les CVs déjà complets ; le CV en cours est écarté.
+    """
+    prompt = build_cv_prompt(offer)
+    print("→ Appel à l'API Mistral (flux)...")
+    start = time.perf_counter()
+    stream = ObjectStream()
+    cvs = []
+
+    def accept(objects):
+        for cv in objects:
+            if not is_valid_cv(cv):
+                print(f"⚠️ CV invalide : {str(cv)[:100]}")
+                continue
+            if not cvs:
+                print(f"→ Premier CV reçu en {time.perf_counter() - start:.1f} s")
+            cvs.append(cv)
+            on_cv(cv)
+
+    finish_reason = None
+    for delta, finish_reason in stream_mistral_api(prompt, max_tokens=4000, temperature=0.7, log_func=log_func):
+        accept(stream.feed(delta))
+    stream.close()
+    if finish_reason == "length":
+        print(f"⚠️ Génération tronquée (max_tokens) : {len(cvs)} CVs conservés")
+    print(f"→ Flux terminé en {time.perf_counter() - start:.1f} s")
     return cvs
 
+def store_cv(cv_collection, cv: Dict[str, Any]) -> bool:
+    # Vérifier si le CV existe déjà
+    existing = cv_collection.find_one({"userId": cv["userId"]})
+    if existing:
+        print(f"ℹ️ CV déjà en base (ID: {cv['userId']})")
+        return False
+    # Insérer le CV
+    cv_collection.insert_one(cv)
+    print(f"✅ CV inséré (ID: {cv['userId']})")
+    return True
+
 def store_cvs_in_mongodb(cvs: List[Dict[str, Any]], offer_id: str):
+    cv_collection = get_cv_collection()
     for cv in cvs:
         if not is_valid_cv(cv):
             print(f"⚠️ CV invalide : {cv}")
             continue
-        # Vérifier si le CV existe déjà
-        existing = cv_collection.find_one({"userId": cv["userId"]})
-        if existing:
-            print(f"ℹ️ CV déjà en base (ID: {cv['userId']})")
-            continue
-        # Insérer le CV
-        cv_collection.insert_one(cv)
-        print(f"✅ CV inséré (ID: {cv['userId']})")
+        store_cv(cv_collection, cv)
 
-def process_offers(offers: List[Dict[str, Any]], limit: int = None):
+def process_offers(offers: List[Dict[str, Any]], limit: int = None, stream: bool = MISTRAL_STREAM, on_result=None):
+    # on_result(offre, réussi) est appelé après chaque offre (suivi de la génération par le démon)
     if limit:
         offers = offers[:limit]
         print(f"⚠️ Mode test: {limit} offres")
@@ -382,9 +443,15 @@ def process_offers(offers: List[Dict[str, Any]], limit: int = None):
         print('='*80)
 
         try:
-            cvs = generate_adapted_cvs(offer)
+            if stream:
+                # Chaque CV est enregistré dès sa réception
+                cv_collection = get_cv_collection()
+                cvs = stream_adapted_cvs(offer, lambda cv: store_cv(cv_collection, cv))
+            else:
+                cvs = generate_adapted_cvs(offer)
+                if cvs:
+                    store_cvs_in_mongodb(cvs, offer_id)
             if cvs:
-                inserted = store_cvs_in_mongodb(cvs, offer_id)
                 success += 1          # ← 8 espaces (2 tabs) ICI
                 print(f"✅ {len(cvs)} CVs OK")
             else:
@@ -395,10 +462,16 @@ def process_offers(offers: List[Dict[str, Any]], limit: int = None):
             break
         except Exception as e:
             failed += 1
+            cvs = None
             print(f"💥 Erreur: {e}")
+        if on_result is not None:
+            on_result(offer, bool(cvs))
 
     print(f"\n{'='*80}")
     print(f"RÉSULTATS: {success} ✅ | {failed} ❌ | Total: {total}")
+    defects = defect_report()
+    if defects:
+        print("Réparations JSON : " + ", ".join(f"{k}={v}" for k, v in sorted(defects.items())))
     print('='*80)
 
 if __name__ == "__main__":
@@ -407,7 +480,7 @@ if __name__ == "__main__":
     print("="*80 + "\n")
 
     # Vérification des connexions MongoDB
-    offers_collection, cv_collection = check_mongodb_connections()
+    check_mongodb_connections()
 
     # Récupération des offres
     all_offers = get_offers()
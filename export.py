@@ -0,0 +1,216 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from index import JSONEncoder
+
+load_dotenv()
+# --- Configuration ---
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 5000))
+EXPORT_ROWS_PER_FILE = int(os.getenv("EXPORT_ROWS_PER_FILE", 500000))
+EXPORT_FORMATS = ("parquet", "arrow", "ndjson")
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow", "ndjson": "ndjson"}
+
+
+def json_default(value):
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False) if value is not None else None
+
+
+def text(value):
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def date(value):
+    return value if isinstance(value, datetime) else None
+
+
+def string_list(value):
+    if not isinstance(value, list):
+        return None
+    return [v if isinstance(v, str) else json.dumps(v, cls=JSONEncoder, ensure_ascii=False) for v in value]
+
+
+# --- Schémas fixes ---
+# (colonne, type, fonction d'extraction depuis le document Mongo)
+# Les champs à faible cardinalité (site, typeContrat, domain) sont encodés en dictionnaire.
+def offer_columns(pa):
+    return [
+        ("_id", pa.string(), lambda d: str(d["_id"])),
+        ("idOffre", pa.string(), lambda d: text(d.get("idOffre"))),
+        ("site", pa.dictionary(pa.int16(), pa.string()), lambda d: text(d.get("site"))),
+        ("titre", pa.string(), lambda d: text(d.get("titre"))),
+        ("entreprise", pa.string(), lambda d: text(d.get("entreprise"))),
+        ("lien", pa.string(), lambda d: text(d.get("lien"))),
+        ("localisation", pa.string(), lambda d: text(d.get("localisation"))),
+        ("typeContrat", pa.dictionary(pa.int16(), pa.string()), lambda d: text(d.get("typeContrat"))),
+        ("datePublication", pa.timestamp("ms"), lambda d: date(d.get("datePublication"))),
+        ("dateInscriptionBase", pa.timestamp("ms"), lambda d: date(d.get("dateInscriptionBase"))),
+        ("salaire", pa.string(), lambda d: text(d.get("salaire"))),
+        ("mission", pa.string(), lambda d: text(d.get("mission"))),
+        ("profilRecherche", pa.string(), lambda d: text(d.get("profilRecherche"))),
+        ("about", pa.string(), lambda d: text(d.get("about"))),
+        ("pageSource", pa.string(), lambda d: text(d.get("pageSource"))),
+        ("skills", pa.list_(pa.string()), lambda d: string_list(d.get("skills"))),
+    ]
+
+
+def cv_columns(pa):
+    def basics(d, field):
+        b = d.get("basics")
+        return text(b.get(field)) if isinstance(b, dict) else None
+
+    return [
+        ("_id", pa.string(), lambda d: str(d["_id"])),
+        ("userId", pa.string(), lambda d: text(d.get("userId"))),
+        ("name", pa.string(), lambda d: basics(d, "name")),
+        ("label", pa.string(), lambda d: basics(d, "label")),
+        ("email", pa.string(), lambda d: basics(d, "email")),
+        ("summary", pa.string(), lambda d: basics(d, "summary")),
+        ("domain", pa.dictionary(pa.int16(), pa.string()), lambda d: text(d.get("domain"))),
+        ("skills", pa.list_(pa.string()), lambda d: string_list(d.get("skills"))),
+        # Sous-documents de longueur variable : conservés en JSON
+        ("work", pa.string(), lambda d: json_default(d.get("work"))),
+        ("education", pa.string(), lambda d: json_default(d.get("education"))),
+        ("certifications", pa.string(), lambda d: json_default(d.get("certifications"))),
+        ("languages", pa.string(), lambda d: json_default(d.get("languages"))),
+    ]
+
+
+COLUMNS = {"offers": offer_columns, "cvs": cv_columns}
+
+
+# --- Watermark (dernier _id exporté) ---
+def watermark_path(output_dir, name):
+    return os.path.join(output_dir, name, "_watermark.json")
+
+
+def read_watermark(output_dir, name):
+    path = watermark_path(output_dir, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return ObjectId(json.load(f)["lastId"])
+
+
+def write_watermark(output_dir, name, last_id, rows):
+    path = watermark_path(output_dir, name)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"lastId": str(last_id), "rows": rows, "exportedAt": datetime.now().isoformat()}, f)
+    os.replace(path + ".tmp", path)
+
+
+class ChunkedWriter:
+    """Écrit des record batches dans des fichiers successifs de `rows_per_file` lignes maximum."""
+
+    def __init__(self, pa, fmt, directory, prefix, schema, rows_per_file):
+        self.pa = pa
+        self.fmt = fmt
+        self.directory = directory
+        self.prefix = prefix
+        self.schema = schema
+        self.rows_per_file = rows_per_file
+        self.writer = None
+        self.rows_in_file = 0
+        self.part = 0
+        self.files = []
+
+    def _open(self):
+        self.part += 1
+        path = os.path.join(self.directory, f"{self.prefix}-{self.part:05d}.{FILE_EXTENSIONS[self.fmt]}")
+        self.files.append(path)
+        self.rows_in_file = 0
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        elif self.fmt == "arrow":
+            import pyarrow.ipc as ipc
+            options = ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+            self.writer = ipc.new_file(path, self.schema, options=options)
+        else:
+            self.writer = open(path, "w", encoding="utf-8")
+
+    def write(self, batch, documents):
+        if self.writer is None or self.rows_in_file >= self.rows_per_file:
+            self.close()
+            self._open()
+        if self.fmt == "ndjson":
+            for doc in documents:
+                self.writer.write(json.dumps(doc, cls=JSONEncoder, ensure_ascii=False) + "\n")
+        else:
+            self.writer.write_batch(batch)
+        self.rows_in_file += len(documents)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def export_collection(collection, name, formats=("parquet",), output_dir=EXPORT_DIR, incremental=True,
+                      batch_size=EXPORT_BATCH_SIZE, rows_per_file=EXPORT_ROWS_PER_FILE):
+    """
+    Exporte une collection en flux : curseur par lots triés par _id, un record batch par lot,
+    mémoire constante quelle que soit la taille de la collection.
+    """
+    import pyarrow as pa
+    columns = COLUMNS[name](pa)
+    schema = pa.schema([(column, type_) for column, type_, _ in columns])
+    directory = os.path.join(output_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    last_id = read_watermark(output_dir, name) if incremental else None
+    query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+    prefix = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    writers = [ChunkedWriter(pa, fmt, directory, prefix, schema, rows_per_file) for fmt in formats]
+    start = time.perf_counter()
+    rows = 0
+    documents = []
+
+    dictionaries = {column: {} for column, type_, _ in columns if pa.types.is_dictionary(type_)}
+
+    def flush():
+        batch = None
+        if any(fmt != "ndjson" for fmt in formats):
+            arrays = []
+            for column, type_, extract in columns:
+                values = [extract(doc) for doc in documents]
+                if column in dictionaries:
+                    # Dictionnaire stable sur tout l'export : chaque lot ne fait qu'ajouter des valeurs
+                    # (delta), ce qu'exige le format de fichier Arrow IPC
+                    codes = dictionaries[column]
+                    indices = [None if v is None else codes.setdefault(v, len(codes)) for v in values]
+                    arrays.append(pa.DictionaryArray.from_arrays(
+                        pa.array(indices, type=type_.index_type), pa.array(list(codes), type=pa.string())))
+                else:
+                    arrays.append(pa.array(values, type=type_))
+            batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+        for writer in writers:
+            writer.write(batch, documents)
+
+    try:
+        for doc in collection.find(query, batch_size=batch_size).sort("_id", 1):
+            documents.append(doc)
+            if len(documents) >= batch_size:
+                flush()
+                rows += len(documents)
+                last_id = documents[-1]["_id"]
+                documents = []
+        if documents:
+            flush()
+            rows += len(documents)
+            last_id = documents[-1]["_id"]
+    finally:
+        for writer in writers:
+            writer.close()
+    # Le watermark n'avance qu'une fois tous les fichiers écrits
+    if rows:
+        write_watermark(output_dir, name, last_id, rows)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Export '{name}' : {rows} documents en {elapsed:.1f} s ({', '.join(formats)})")
+    return rows
@@ -0,0 +1,241 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import requests
+from dotenv import load_dotenv
+
+from archive import KIND_FRANCETRAVAIL_SEARCH, archive_page
+from retry import backoff_delay
+
+load_dotenv()
+# --- Configuration ---
+FRANCETRAVAIL_HARVEST_WORKERS = int(os.getenv("FRANCETRAVAIL_HARVEST_WORKERS", 4))
+# Fenêtre de dates minimale avant de découper par département
+FRANCETRAVAIL_MIN_WINDOW_MINUTES = float(os.getenv("FRANCETRAVAIL_MIN_WINDOW_MINUTES", 60))
+FRANCETRAVAIL_REQUEST_ATTEMPTS = int(os.getenv("FRANCETRAVAIL_REQUEST_ATTEMPTS", 3))
+PAGE_SIZE = 150
+# L'API refuse range au-delà de 3149 : au plus 3150 résultats atteignables par requête
+MAX_RANGE_END = 3149
+MAX_REACHABLE = MAX_RANGE_END + 1
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+CONTENT_RANGE_PATTERN = re.compile(r"(\d+)-(\d+)/(\d+)")
+# Métropole (hors 20), Corse et outre-mer
+DEPARTEMENTS = tuple(f"{n:02d}" for n in range(1, 96) if n != 20) + ("2A", "2B", "971", "972", "973", "974", "976")
+
+
+class Slice:
+    """Portion de l'espace de recherche : fenêtre de dates [start, end], éventuellement un département."""
+
+    __slots__ = ("start", "end", "departement", "depth")
+
+    def __init__(self, start, end, departement=None, depth=0):
+        self.start = start
+        self.end = end
+        self.departement = departement
+        self.depth = depth
+
+    def params(self):
+        params = {"minCreationDate": self.start.strftime(DATE_FORMAT), "maxCreationDate": self.end.strftime(DATE_FORMAT)}
+        if self.departement:
+            params["departement"] = self.departement
+        return params
+
+    def split(self, min_window):
+        """Sous-tranches : deux demi-fenêtres de dates, puis les départements ; [] si indivisible."""
+        if self.end - self.start > min_window:
+            middle = self.start + (self.end - self.start) / 2
+            middle = middle.replace(microsecond=0)
+            # Les bornes sont à la seconde mais dateCreation a des millisecondes : les deux moitiés
+            # partagent la seconde `middle`, les offres vues deux fois sont dédoublonnées sur `id`
+            return [Slice(self.start, middle, self.departement, self.depth + 1),
+                    Slice(middle, self.end, self.departement, self.depth + 1)]
+        if self.departement is None:
+            return [Slice(self.start, self.end, code, self.depth + 1) for code in DEPARTEMENTS]
+        return []
+
+    def __repr__(self):
+        where = f" dép. {self.departement}" if self.departement else ""
+        return f"{self.start.strftime(DATE_FORMAT)} → {self.end.strftime(DATE_FORMAT)}{where}"
+
+
+class HarvestStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.splits = 0
+        self.leaves = 0
+        self.drained = 0
+        # Tranches indivisibles encore au-delà de la limite ou en échec : à retenter
+        self.truncated = []
+        self.failed = []
+        # Tranches découpées dont les sous-tranches n'atteignent pas le total annoncé (offres sans
+        # département reconnu) : aucune facette ne les atteint, une nouvelle collecte n'y changerait rien
+        self.unreachable = []
+        self.expected = 0
+        self.fetched = 0
+        self.duplicates = 0
+
+    def add(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def report(self, unique):
+        return {
+            "requests": self.requests, "splits": self.splits, "leaves": self.leaves, "drained": self.drained,
+            "truncated": [repr(s) for s in self.truncated], "failed": [repr(s) for s in self.failed],
+            "unreachable": [f"{s!r} ({missing} offres)" for s, missing in self.unreachable],
+            "unreachableOffers": sum(missing for _, missing in self.unreachable),
+            "expected": self.expected, "fetched": self.fetched, "duplicates": self.duplicates, "unique": unique,
+            "retryable": bool(self.truncated or self.failed) or self.fetched < self.expected,
+            "complete": not self.truncated and not self.failed and not self.unreachable and self.fetched >= self.expected,
+        }
+
+
+def parse_total(response, results):
+    # Content-Range: offres 0-149/1234 ; sans en-tête, seul le nombre de résultats reçus est connu
+    match = CONTENT_RANGE_PATTERN.search(response.headers.get("Content-Range", ""))
+    if match:
+        return int(match.group(3))
+    return len(results) if len(results) < PAGE_SIZE else None
+
+
+class FranceTravailHarvester:
+    """
+    Collecte complète de offres/search : toute tranche qui annonce plus de résultats que la limite
+    de `range` est redécoupée (dates, puis départements) ; les tranches feuilles sont vidées
+    en parallèle et les offres dédoublonnées sur `id`.
+    """
+
+    def __init__(self, token, search_url, workers=FRANCETRAVAIL_HARVEST_WORKERS,
+                 min_window=timedelta(minutes=FRANCETRAVAIL_MIN_WINDOW_MINUTES), session=None):
+        self.token = token
+        self.search_url = search_url
+        self.workers = workers
+        self.min_window = min_window
+        self.session = session or requests.Session()
+        self.stats = HarvestStats()
+        self.offers = {}
+        self.offers_lock = threading.Lock()
+
+    def fetch(self, slice_, range_start):
+        """(résultats, total annoncé) pour une page de la tranche ; lève l'exception après les tentatives."""
+        params = dict(slice_.params(), range=f"{range_start}-{range_start + PAGE_SIZE - 1}")
+        headers = {"Accept": "application/json", "Authorization": f"Bearer {self.token}"}
+        for attempt in range(FRANCETRAVAIL_REQUEST_ATTEMPTS):
+            self.stats.add(requests=1)
+            response = self.session.get(self.search_url, params=params, headers=headers, timeout=10)
+            if response.status_code == 204:
+                return [], 0
+            if response.status_code in (429, 500, 502, 503) and attempt + 1 < FRANCETRAVAIL_REQUEST_ATTEMPTS:
+                retry_after = response.headers.get("Retry-After", "")
+                time.sleep(float(retry_after) if retry_after.isdigit() else backoff_delay(attempt, base=1, maximum=30))
+                continue
+            response.raise_for_status()
+            archive_page(KIND_FRANCETRAVAIL_SEARCH, response.url, response.content)
+            results = response.json().get("resultats", [])
+            return results, parse_total(response, results)
+
+    def keep(self, results):
+        duplicates = 0
+        with self.offers_lock:
+            for offer in results:
+                key = offer.get("id")
+                if key in self.offers:
+                    duplicates += 1
+                else:
+                    self.offers[key] = offer
+        self.stats.add(fetched=len(results), duplicates=duplicates)
+
+    def process(self, slice_):
+        """
+        Traite une tranche : la vide si elle tient dans la limite, sinon la découpe.
+        Retourne (total annoncé, sous-tranches à traiter).
+        """
+        results, total = self.fetch(slice_, 0)
+        if total is not None and total > MAX_REACHABLE:
+            children = slice_.split(self.min_window)
+            if children:
+                self.stats.add(splits=1)
+                return total, children
+            print(f"⚠️ France Travail : tranche indivisible {slice_} ({total} offres > {MAX_REACHABLE})")
+            with self.stats.lock:
+                self.stats.truncated.append(slice_)
+        self.stats.add(leaves=1, expected=min(total, MAX_REACHABLE) if total is not None else 0)
+        self.keep(results)
+        received = len(results)
+        range_start = PAGE_SIZE
+        while len(results) == PAGE_SIZE and range_start <= MAX_RANGE_END and (total is None or range_start < total):
+            results, page_total = self.fetch(slice_, range_start)
+            if total is None and page_total is not None:
+                self.stats.add(expected=page_total)
+                total = page_total
+            self.keep(results)
+            received += len(results)
+            range_start += PAGE_SIZE
+        if total is None:
+            self.stats.add(expected=received)
+        if total is None or received >= min(total, MAX_REACHABLE):
+            self.stats.add(drained=1)
+        return (received if total is None else total), []
+
+    def reconcile(self, split, child_total):
+        """Ajoute le total d'une sous-tranche à sa tranche mère ; vérifie la somme quand toutes ont répondu."""
+        if child_total is None:
+            split["failed"] = True
+        else:
+            split["sum"] += child_total
+        split["pending"] -= 1
+        if split["pending"] or split["failed"]:
+            return
+        # Les moitiés de dates se recouvrent d'une seconde : leur somme peut dépasser le total, jamais l'inverse
+        missing = split["total"] - split["sum"]
+        if missing > 0:
+            print(f"⚠️ France Travail : {missing} offres de {split['slice']} hors des sous-tranches")
+            with self.stats.lock:
+                self.stats.unreachable.append((split["slice"], missing))
+
+    def harvest(self, start, end):
+        # Tranche en cours -> découpage de sa tranche mère (total annoncé, somme des sous-tranches)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="francetravail") as executor:
+            root = Slice(start, end)
+            pending[executor.submit(self.process, root)] = (root, None)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    slice_, parent = pending.pop(future)
+                    try:
+                        total, children = future.result()
+                    except Exception as e:
+                        print(f"❌ Erreur API France Travail ({slice_}): {e}")
+                        with self.stats.lock:
+                            self.stats.failed.append(slice_)
+                        total, children = None, []
+                    if parent is not None:
+                        self.reconcile(parent, total)
+                    if not children:
+                        continue
+                    split = {"slice": slice_, "total": total, "sum": 0, "pending": len(children), "failed": False}
+                    for child in children:
+                        pending[executor.submit(self.process, child)] = (child, split)
+        return list(self.offers.values())
+
+
+def harvest_francetravail(token, search_url, min_creation_date, max_creation_date, workers=FRANCETRAVAIL_HARVEST_WORKERS):
+    start = datetime.strptime(min_creation_date, DATE_FORMAT)
+    end = datetime.strptime(max_creation_date, DATE_FORMAT)
+    harvester = FranceTravailHarvester(token, search_url, workers)
+    started = time.perf_counter()
+    offers = harvester.harvest(start, end)
+    coverage = harvester.stats.report(len(offers))
+    status = "✅ couverture complète" if coverage["complete"] else "⚠️ couverture incomplète"
+    print(f"{status} France Travail : {coverage['unique']} offres uniques, {coverage['leaves']} tranches "
+          f"({coverage['drained']} vidées, {coverage['splits']} découpages, {len(coverage['truncated'])} tronquées, "
+          f"{len(coverage['failed'])} en échec, {coverage['unreachableOffers']} offres hors facettes), "
+          f"{coverage['requests']} requêtes en {time.perf_counter() - started:.1f} s")
+    return offers, coverage
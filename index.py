@@ -4,26 +4,34 @@ import time
 import random
 import json
 import re
+import sys
 from dotenv import load_dotenv
 import os
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-from pymongo import MongoClient
+from datetime import datetime, timedelta, timezone
 from pymongo.errors import ConnectionFailure, DuplicateKeyError
 from bson import ObjectId
-from webdriver_manager.chrome import ChromeDriverManager
+from indexes import ensure_offer_indexes
+from mongo_clients import get_collection, ping
+from francetravail import harvest_francetravail
+from crawl import CrawlStats, PAGE_EMPTY, PAGE_FAILED, PAGE_OK, crawl_pages, parse_last_page
+from retry import METRICS, CircuitBreaker, RetryQueue
+from skills import extract_offer_skills
+from offers import JobOffer
+from archive import (
+    archive_page,
+    get_archive,
+    KIND_HELLOWORK_LISTING,
+    KIND_HELLOWORK_DETAIL,
+    KIND_FREEWORK_LISTING,
+    KIND_FREEWORK_DETAIL,
+    KIND_FRANCETRAVAIL_SEARCH,
+)
 
 load_dotenv()
 # --- Configuration ---
 START_PAGE = int(os.getenv("START_PAGE", 1))
 END_PAGE = int(os.getenv("END_PAGE", 50000))
-MAX_JOBS_PER_PAGE = os.getenv("MAX_JOBS_PER_PAGE", None)
+MAX_JOBS_PER_PAGE = int(os.getenv("MAX_JOBS_PER_PAGE")) if os.getenv("MAX_JOBS_PER_PAGE", "").isdigit() else None
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME")
@@ -32,21 +40,43 @@ FRANCETRAVAIL_CLIENT_SECRET = os.getenv("FRANCETRAVAIL_CLIENT_SECRET")
 FRANCETRAVAIL_GRANT_TYPE = os.getenv("FRANCETRAVAIL_GRANT_TYPE")
 FRANCETRAVAIL_SCOPE = os.getenv("FRANCETRAVAIL_SCOPE")
 FRANCETRAVAIL_REALM = os.getenv("FRANCETRAVAIL_REALM")
+SOURCES = ("hellowork", "francetravail", "freework")
+LISTING_WORKERS = int(os.getenv("LISTING_WORKERS", 1))
+LISTING_SHARD_SIZE = int(os.getenv("LISTING_SHARD_SIZE", 10))
+# Adresses des sites et de l'API (remplaçables par des serveurs locaux, cf. loadtest.py)
+HELLOWORK_BASE_URL = os.getenv("HELLOWORK_BASE_URL", "https://www.hellowork.com")
+FREEWORK_BASE_URL = os.getenv("FREEWORK_BASE_URL", "https://www.free-work.com")
+FRANCETRAVAIL_TOKEN_URL = os.getenv("FRANCETRAVAIL_TOKEN_URL", "https://entreprise.francetravail.fr/connexion/oauth2/access_token")
+FRANCETRAVAIL_SEARCH_URL = os.getenv("FRANCETRAVAIL_SEARCH_URL", "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search")
+# Multiplicateur des pauses entre requêtes (1 = rythme normal)
+SCRAPE_DELAY_SCALE = float(os.getenv("SCRAPE_DELAY_SCALE", 1))
+# Navigateur recyclé après ce nombre d'utilisations (mode démon : pools conservés d'une exécution à l'autre)
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", 50))
 
 # --- Classes utilitaires ---
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, ObjectId):
             return str(obj)
+        if isinstance(obj, datetime):
+            return obj.isoformat()
         return json.JSONEncoder.default(self, obj)
 
+def pause(low, high=None):
+    time.sleep((random.uniform(low, high) if high is not None else low) * SCRAPE_DELAY_SCALE)
+
 # --- Fonctions MongoDB ---
+_indexed_collections = set()
+_indexed_lock = threading.Lock()
+
 def init_mongodb(uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NAME):
     try:
-        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
-        client.server_info()
-        db = client[db_name]
-        collection = db[collection_name]
+        ping(uri)
+        collection = get_collection(uri, db_name, collection_name)
+        with _indexed_lock:
+            if (uri, db_name, collection_name) not in _indexed_collections:
+                ensure_offer_indexes(collection)
+                _indexed_collections.add((uri, db_name, collection_name))
         print(f"✅ Connexion MongoDB réussie (Base: {db_name}, Collection: {collection_name})")
         return collection
     except ConnectionFailure as e:
@@ -56,28 +86,51 @@ def init_mongodb(uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NA
         print(f"❌ Erreur MongoDB: {e}")
         return None
 
-def save_to_mongodb(collection, job_info):
+def save_to_mongodb(collection, offer):
     if collection is None:
         print("⚠️ MongoDB non disponible - pas de sauvegarde en base")
         return False
     try:
-        existing_offer = collection.find_one({"idOffre": job_info["idOffre"]})
+        existing_offer = collection.find_one({"idOffre": offer.idOffre})
         if existing_offer:
-            print(f"ℹ️ Offre déjà en base (ID: {job_info['idOffre']})")
+            print(f"ℹ️ Offre déjà en base (ID: {offer.idOffre})")
             return True
-        result = collection.insert_one(job_info)
+        # Seule conversion JobOffer -> document, à l'enregistrement
+        document = offer.to_document()
+        if "skills" not in document:
+            document["skills"] = extract_offer_skills(document)
+        result = collection.insert_one(document)
         print(f"✅ Offre sauvegardée MongoDB (ID: {result.inserted_id})")
         return True
     except DuplicateKeyError:
-        print(f"ℹ️ Offre déjà existante en base (ID: {job_info['idOffre']})")
+        print(f"ℹ️ Offre déjà existante en base (ID: {offer.idOffre})")
         return True
     except Exception as e:
         print(f"❌ Erreur sauvegarde MongoDB: {e}")
         return False
 
+def upsert_to_mongodb(collection, offer):
+    # Utilisé par le rejeu : met à jour les champs extraits sans toucher à la date d'inscription
+    if collection is None:
+        return False
+    try:
+        fields = offer.to_document()
+        if "skills" not in fields:
+            fields["skills"] = extract_offer_skills(fields)
+        date_inscription = fields.pop("dateInscriptionBase", None)
+        collection.update_one(
+            {"idOffre": fields["idOffre"]},
+            {"$set": fields, "$setOnInsert": {"dateInscriptionBase": date_inscription}},
+            upsert=True,
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Erreur mise à jour MongoDB: {e}")
+        return False
+
 # --- Fonctions France Travail ---
 def get_francetravail_token(client_id, client_secret, grant_type, scope, realm):
-    url = f"https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm={realm}"
+    url = f"{FRANCETRAVAIL_TOKEN_URL}?realm={realm}"
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     data = {
         "client_id": client_id,
@@ -95,64 +148,50 @@ def get_francetravail_token(client_id, client_secret, grant_type, scope, realm):
 
 def search_francetravail_offers_all(token, min_creation_date=None, max_creation_date=None):
     if min_creation_date is None:
-        date_obj = datetime.now() - timedelta(days=30)
+        date_obj = datetime.now(timezone.utc) - timedelta(days=30)
         min_creation_date = date_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
     if max_creation_date is None:
-        max_creation_date = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+        max_creation_date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     if "T" not in min_creation_date:
         min_creation_date = f"{min_creation_date}T00:00:00Z"
     if "T" not in max_creation_date:
         max_creation_date = f"{max_creation_date}T23:59:59Z"
 
-    all_results = []
-    range_start = 0
-    range_limit = 150
-
-    while True:
-        url = f"https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search?minCreationDate={min_creation_date}&maxCreationDate={max_creation_date}&range={range_start}-{range_start + range_limit - 1}"
-        headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            resultats = data.get("resultats", [])
-            if not resultats:
-                break
-            all_results.extend(resultats)
-            if len(resultats) < range_limit:
-                break
-            range_start += range_limit
-        except Exception as e:
-            print(f"❌ Erreur API France Travail: {e}")
-            break
-    return all_results
+    # Découpage adaptatif (dates, puis départements) : aucune tranche ne dépasse la limite de `range`
+    return harvest_francetravail(token, FRANCETRAVAIL_SEARCH_URL, min_creation_date, max_creation_date)
 
 def convert_francetravail_to_hellowork(ft_offer):
-    now_str = datetime.now().strftime('%d/%m/%Y')
-    return {
-        "site": "France Travail",
-        "idOffre": ft_offer.get("id", "N/A"),
-        "titre": ft_offer.get("intitule", "N/A"),
-        "entreprise": ft_offer.get("entreprise", {}).get("nom", "N/A"),
-        "lien": ft_offer.get("origineOffre", {}).get("urlOrigine", "N/A"),
-        "localisation": ft_offer.get("lieuTravail", {}).get("libelle", "N/A"),
-        "typeContrat": ft_offer.get("typeContratLibelle", "N/A"),
-        "datePublication": datetime.fromisoformat(ft_offer.get("dateCreation")).strftime('%d/%m/%Y') if ft_offer.get("dateCreation") else "N/A",
-        "salaire": ft_offer.get("salaire", {}).get("libelle", "Non spécifié"),
-        "mission": ft_offer.get("description", "N/A"),
-        "profilRecherche": "; ".join([c.get("libelle", "") for c in ft_offer.get("competences", [])]) if ft_offer.get("competences") else "Non spécifié",
-        "about": ft_offer.get("entreprise", {}).get("description", "Non spécifié"),
-        "dateInscriptionBase": now_str,
-        "pageSource": "France Travail",
-    }
+    entreprise = ft_offer.get("entreprise") or {}
+    return JobOffer(
+        site="France Travail",
+        idOffre=ft_offer.get("id"),
+        titre=ft_offer.get("intitule"),
+        entreprise=entreprise.get("nom"),
+        lien=(ft_offer.get("origineOffre") or {}).get("urlOrigine"),
+        localisation=(ft_offer.get("lieuTravail") or {}).get("libelle"),
+        typeContrat=ft_offer.get("typeContratLibelle"),
+        datePublication=datetime.fromisoformat(ft_offer.get("dateCreation")) if ft_offer.get("dateCreation") else None,
+        salaire=(ft_offer.get("salaire") or {}).get("libelle"),
+        mission=ft_offer.get("description"),
+        profilRecherche="; ".join([c.get("libelle", "") for c in ft_offer.get("competences", [])]) if ft_offer.get("competences") else None,
+        about=entreprise.get("description"),
+        dateInscriptionBase=datetime.now(timezone.utc),
+        pageSource="France Travail",
+        skills=extract_offer_skills(ft_offer | {"titre": ft_offer.get("intitule"), "mission": ft_offer.get("description")}),
+    )
 
 def save_francetravail_offers_to_mongodb(offers, collection):
-    for offer in offers:
-        hw_offer = convert_francetravail_to_hellowork(offer)
-        save_to_mongodb(collection, hw_offer)
+    # Nombre d'offres non enregistrées (erreur MongoDB)
+    return sum(not save_to_mongodb(collection, convert_francetravail_to_hellowork(offer)) for offer in offers)
 
-# --- Fonctions FreeWork ---
+# --- Navigateur et parsing HTML ---
+# selenium, webdriver_manager et bs4 ne sont importés que par les sources qui les utilisent,
+# pour que les exécutions France Travail seules démarrent sans charger la pile navigateur.
 def create_stealth_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
     chrome_options = Options()
     chrome_options.add_argument('--headless=new')
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
@@ -172,9 +211,119 @@ def create_stealth_driver():
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     return driver
 
-def parse_date_publication(date_text):
+def wait_for_selector(driver, css_selector, timeout):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+    )
+
+def page_loaded(driver):
+    # Document chargé sans blocage (403) : distingue une page vide d'une page qui n'a pas pu être lue
+    if driver.execute_script("return document.readyState") != "complete":
+        return False
+    if "403 Forbidden" in driver.page_source or "403" in driver.title:
+        return False
+    return bool(driver.execute_script("return document.body && document.body.innerText.trim().length"))
+
+def make_soup(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+class DriverPool:
+    # Navigateurs des workers d'un site : celui de la première page est réutilisé par le premier worker.
+    # Un navigateur hors d'usage (plantage, session expirée) ou trop utilisé est fermé au lieu d'être réutilisé.
+    def __init__(self, max_uses=DRIVER_MAX_USES):
+        self.lock = threading.Lock()
+        self.idle = []
+        self.drivers = []
+        self.uses = {}
+        self.max_uses = max_uses
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                driver = self.idle.pop() if self.idle else None
+            if driver is None:
+                break
+            # Resté inactif entre deux exécutions : la session a pu expirer
+            if driver_alive(driver):
+                break
+            self.discard(driver, "session perdue")
+        if driver is None:
+            driver = create_stealth_driver()
+            with self.lock:
+                self.drivers.append(driver)
+        with self.lock:
+            self.uses[id(driver)] = self.uses.get(id(driver), 0) + 1
+        return driver
+
+    def release(self, driver, failed=False):
+        if failed and not driver_alive(driver):
+            self.discard(driver, "hors d'usage")
+            return
+        if self.uses.get(id(driver), 0) >= self.max_uses:
+            self.discard(driver, f"{self.max_uses} utilisations")
+            return
+        with self.lock:
+            self.idle.append(driver)
+
+    def discard(self, driver, reason):
+        print(f"♻️ Navigateur remplacé ({reason})")
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+            self.uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"⚠️ Erreur fermeture navigateur: {e}")
+
+    def quit_all(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"⚠️ Erreur fermeture navigateur: {e}")
+        self.drivers = []
+        self.idle = []
+        self.uses = {}
+
+def driver_alive(driver):
+    # Commande WebDriver minimale : lève WebDriverException si Chrome a planté ou si la session a expiré
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def crawl_listing(name, start_page, end_page, workers, pool, crawl_page, pagination, stats,
+                  retries=None, breaker=None, crawl_retry=None, on_drop=None):
+    if retries is None:
+        retries = RetryQueue(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name)
+    options = {"stats": stats, "retries": retries, "breaker": breaker, "crawl_retry": crawl_retry, "on_drop": on_drop}
+    # 1) Première page seule : elle donne le nombre réel de pages via la pagination
+    crawl_pages(name, start_page, start_page, 1, pool.acquire, pool.release, crawl_page,
+                last_page_known=False, **options)
+    if stats.empty_pages and pagination["last_page"] is None:
+        return stats
+    last_page = pagination["last_page"]
+    if last_page is not None:
+        pagination["end_page"] = min(end_page, last_page)
+        print(f"📄 [{name}] Dernière page détectée : {last_page} → pages {start_page}-{pagination['end_page']}")
+    else:
+        print(f"⚠️ [{name}] Pagination introuvable, parcours jusqu'à la première page vide (max {end_page})")
+    # 2) Pages suivantes réparties en tranches entre les workers
+    crawl_pages(name, start_page + 1, pagination["end_page"], workers, pool.acquire, pool.release, crawl_page,
+                shard_size=LISTING_SHARD_SIZE, last_page_known=last_page is not None, **options)
+    return stats
+
+def parse_date_publication(date_text, reference=None):
     date_text = date_text.lower().strip()
-    now = datetime.now()
+    now = reference or datetime.now(timezone.utc)
     heures_match = re.search(r'(\d+)\s*heure', date_text)
     jours_match = re.search(r'(\d+)\s*jour', date_text)
     if heures_match:
@@ -189,359 +338,437 @@ def parse_date_publication(date_text):
         date_publication = now - timedelta(days=1)
     else:
         date_publication = now
-    return date_publication.strftime('%d/%m/%Y')
+    return date_publication
 
+# --- Fonctions FreeWork ---
 def scrape_freework_page(driver, page_num):
-    url = f"https://www.free-work.com/fr/tech-it/jobs?page={page_num}&locations=fr~~~"
+    # (liens, page, nombre) ; page None si elle n'a pas pu être chargée, liens [] si elle ne contient aucune offre
+    url = f"{FREEWORK_BASE_URL}/fr/tech-it/jobs?page={page_num}&locations=fr~~~"
     print(f"🔍 Chargement: {url}")
     try:
         driver.get(url)
-        time.sleep(random.uniform(4, 6))
+        pause(4, 6)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
-        time.sleep(1)
+        pause(1)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        time.sleep(1)
+        pause(1)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/fr/tech-it/'][href*='/job-mission/']"))
-        )
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        job_links = []
-        all_links = soup.find_all('a', href=re.compile(r'/fr/tech-it/.*?/job-mission/'))
-        for link in all_links:
-            href = link.get('href')
-            if href and not href.startswith('http'):
-                full_url = f"https://www.free-work.com{href}"
-                if full_url not in job_links:
-                    job_links.append(full_url)
+        pause(2)
+        try:
+            wait_for_selector(driver, "a[href*='/fr/tech-it/'][href*='/job-mission/']", 15)
+        except Exception:
+            # Aucun lien d'offre : fin de la liste si la page s'est chargée normalement, échec sinon
+            if not page_loaded(driver):
+                print(f"❌ Page FreeWork {page_num} non chargée")
+                return [], None, None
+        html = driver.page_source
+        archive_page(KIND_FREEWORK_LISTING, url, html, meta={"page": page_num})
+        job_links = parse_freework_listing(html)
         print(f"✅ {len(job_links)} offres trouvées sur la page {page_num}")
         return job_links, str(page_num), str(len(job_links))
     except Exception as e:
         print(f"❌ Erreur scraping page FreeWork: {e}")
         return [], None, None
 
-def extract_freework_job_info(job_url, driver, page_num, idx, mongo_collection=None):
-    job_info = {"site": "FreeWork"}
+def parse_freework_listing(html):
+    soup = make_soup(html)
+    job_links = []
+    all_links = soup.find_all('a', href=re.compile(r'/fr/tech-it/.*?/job-mission/'))
+    for link in all_links:
+        href = link.get('href')
+        if href and not href.startswith('http'):
+            full_url = f"{FREEWORK_BASE_URL}{href}"
+            if full_url not in job_links:
+                job_links.append(full_url)
+    return job_links
+
+def freework_offer_id(job_url, page_num=None, idx=None):
     url_parts = job_url.split('/')
-    job_info["idOffre"] = f"FW-{url_parts[-1]}" if len(url_parts) > 0 else f"FW-{page_num}-{idx}"
-    print(f"\n   🆔 ID Offre: {job_info['idOffre']}")
+    return f"FW-{url_parts[-1]}" if len(url_parts) > 0 else f"FW-{page_num}-{idx}"
+
+def extract_freework_job_info(job_url, driver, page_num, idx, mongo_collection=None, retries=None, breaker=None):
+    # {} si l'offre est déjà en base, None si la page n'a pas pu être lue (reprise programmée dans `retries`).
+    # Le disjoncteur n'est consulté qu'avant la requête réseau : une offre déjà en base ne prend pas le test de reprise.
+    offer = JobOffer(site="FreeWork", idOffre=freework_offer_id(job_url, page_num, idx))
+    print(f"\n   🆔 ID Offre: {offer.idOffre}")
+    fetching = False
     try:
         if mongo_collection is not None:
-            existing_offer = mongo_collection.find_one({"idOffre": job_info["idOffre"]})
+            existing_offer = mongo_collection.find_one({"idOffre": offer.idOffre})
             if existing_offer:
                 print(f"   ℹ️ Offre déjà en base - Ignorée")
                 return {}
+        if breaker is not None:
+            breaker.wait()
+            fetching = True
         driver.get(job_url)
-        time.sleep(random.uniform(3, 5))
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        # Titre
-        h1_elem = soup.find("h1")
-        if h1_elem:
-            em_elem = h1_elem.find("em")
-            if em_elem:
-                em_elem.decompose()  # Supprime la balise <em> et son contenu
-            job_info["titre"] = h1_elem.get_text(strip=True)
-        else:
-            job_info["titre"] = 'N/A'
-        print(f"   📌 Titre: {job_info['titre']}")
-        # Entreprise
-        entreprise_elems = soup.select("p.font-semibold.text-sm")
-        if entreprise_elems and len(entreprise_elems) > 0:
-            entreprise_elem = entreprise_elems[0]  # Prend le premier élément
-            job_info["entreprise"] = entreprise_elem.get_text(strip=True)
-        else:
-            job_info["entreprise"] = 'N/A'
-        print(f"   🏢 Entreprise: {job_info['entreprise']}")
-        # Lien
-        job_info["lien"] = job_url
-        # Type de contrat
-        tags_div = soup.find("div", class_="tags relative w-full")
-        contrats = []
-        if tags_div:
-            contrat_elems = tags_div.find_all("span", class_=re.compile(r"tag"))
-            for elem in contrat_elems:
-                contrat_text = elem.get_text(strip=True)
-                contrats.append(contrat_text)
-
-        contrats = list(set(contrats))
-        job_info["typeContrat"] = ", ".join(contrats) if contrats else "N/A"
-        print(f"   📄 Contrat: {job_info['typeContrat']}")
-        # Localisation
-        location_blocks = soup.find_all("div", class_="flex items-center py-1")
-        localisation = "N/A"
-        for block in reversed(location_blocks):
-            if block.find("svg"):
-                localisation = block.get_text(separator=" ", strip=True)
-                break
-        job_info["localisation"] = localisation
-        # Date de publication
-        date_elem = soup.find("time") or soup.find(string=re.compile(r'\d+\s+(jour|heure)'))
-        if date_elem:
-            date_text = date_elem.get_text() if hasattr(date_elem, 'get_text') else str(date_elem)
-            job_info["datePublication"] = parse_date_publication(date_text)
-        else:
-            job_info["datePublication"] = datetime.now().strftime('%d/%m/%Y')
-        print(f"   📅 Date: {job_info['datePublication']}")
-        job_info["dateInscriptionBase"] = datetime.now().strftime('%d/%m/%Y')
-        # Salaire
-        salary_blocks = soup.find_all("div", class_="flex items-center py-1")
-        salaire = "Non spécifié"
-        for block in salary_blocks:
-            text = block.get_text(separator=" ", strip=True)
-            if re.search(r"\b\d+[kK]?\s*€", text):
-                salaire = text
-                break
-        job_info["salaire"] = salaire
-        # Mission
-        mission_elem = soup.find("div", class_=re.compile(r"description|content|prose"))
-        job_info["mission"] = mission_elem.get_text(strip=True) if mission_elem else 'Non spécifié'
-        print(f"   📋 Mission: {job_info['mission'][:60]}...")
-        # Profil recherché
-        profil_elem = soup.find("h2", string=re.compile(r"Profil|Compétence"))
-        if profil_elem:
-            profil_section = profil_elem.find_next_sibling()
-            job_info["profilRecherche"] = profil_section.get_text(strip=True) if profil_section else 'Non spécifié'
-        else:
-            job_info["profilRecherche"] = 'Non spécifié'
-        print(f"   👤 Profil: {job_info['profilRecherche'][:50]}...")
-        # À propos
-        about_elem = soup.find("div", class_="mt-4 line-clamp-3")
-        about_text = "Non spécifié"
-        if about_elem:
-            about_text = about_elem.get_text(separator=" ", strip=True)
-        else:
-            # Si la classe exacte n'est pas trouvée, essayer une recherche plus large
-            about_elem = soup.find("div", class_=re.compile(r"mt-4"))
-            if about_elem:
-                about_text = about_elem.get_text(separator=" ", strip=True)
-        about_text = about_text.replace("\r\n", " ").replace("\n", " ").strip()
-        about_text = ' '.join(about_text.split())
-        job_info["about"] = about_text
-        print(f"   📄 About: {job_info['about'][:100]}...")
-        job_info["pageSource"] = "Free-Work"
+        pause(3, 5)
+        html = driver.page_source
+        archive_page(KIND_FREEWORK_DETAIL, job_url, html)
+        parse_freework_job_page(html, job_url, offer)
+        if fetching:
+            breaker.record_success()
+            fetching = False
         # Sauvegarde MongoDB
         if mongo_collection is not None:
-            save_to_mongodb(mongo_collection, job_info)
-        return job_info
+            save_to_mongodb(mongo_collection, offer)
+        return offer
     except Exception as e:
         print(f"   ⚠️ Erreur extraction FreeWork: {e}")
-        return {}
+        if fetching:
+            breaker.record_failure()
+        if retries is not None:
+            retries.push(("detail", {"url": job_url, "page": page_num, "idx": idx}))
+        return None
+
+def parse_freework_job_page(html, job_url, offer, reference=None):
+    soup = make_soup(html)
+    # Titre
+    h1_elem = soup.find("h1")
+    if h1_elem:
+        em_elem = h1_elem.find("em")
+        if em_elem:
+            em_elem.decompose()  # Supprime la balise <em> et son contenu
+        offer.titre = h1_elem.get_text(strip=True)
+    print(f"   📌 Titre: {offer.titre}")
+    # Entreprise
+    entreprise_elems = soup.select("p.font-semibold.text-sm")
+    if entreprise_elems and len(entreprise_elems) > 0:
+        entreprise_elem = entreprise_elems[0]  # Prend le premier élément
+        offer.entreprise = entreprise_elem.get_text(strip=True)
+    print(f"   🏢 Entreprise: {offer.entreprise}")
+    # Lien
+    offer.lien = job_url
+    # Type de contrat
+    tags_div = soup.find("div", class_="tags relative w-full")
+    contrats = []
+    if tags_div:
+        contrat_elems = tags_div.find_all("span", class_=re.compile(r"tag"))
+        for elem in contrat_elems:
+            contrat_text = elem.get_text(strip=True)
+            contrats.append(contrat_text)
 
-def scrape_freework(start_page=1, end_page=1, mongodb_uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NAME):
+    contrats = list(set(contrats))
+    offer.typeContrat = ", ".join(contrats) if contrats else None
+    print(f"   📄 Contrat: {offer.typeContrat}")
+    # Localisation
+    location_blocks = soup.find_all("div", class_="flex items-center py-1")
+    for block in reversed(location_blocks):
+        if block.find("svg"):
+            offer.localisation = block.get_text(separator=" ", strip=True)
+            break
+    # Date de publication
+    date_elem = soup.find("time") or soup.find(string=re.compile(r'\d+\s+(jour|heure)'))
+    if date_elem:
+        date_text = date_elem.get_text() if hasattr(date_elem, 'get_text') else str(date_elem)
+        offer.datePublication = parse_date_publication(date_text, reference)
+    else:
+        offer.datePublication = reference or datetime.now(timezone.utc)
+    print(f"   📅 Date: {offer.datePublication}")
+    offer.dateInscriptionBase = reference or datetime.now(timezone.utc)
+    # Salaire
+    salary_blocks = soup.find_all("div", class_="flex items-center py-1")
+    for block in salary_blocks:
+        text = block.get_text(separator=" ", strip=True)
+        if re.search(r"\b\d+[kK]?\s*€", text):
+            offer.salaire = text
+            break
+    # Mission
+    mission_elem = soup.find("div", class_=re.compile(r"description|content|prose"))
+    offer.mission = mission_elem.get_text(strip=True) if mission_elem else None
+    print(f"   📋 Mission: {(offer.mission or '')[:60]}...")
+    # Profil recherché
+    profil_elem = soup.find("h2", string=re.compile(r"Profil|Compétence"))
+    if profil_elem:
+        profil_section = profil_elem.find_next_sibling()
+        offer.profilRecherche = profil_section.get_text(strip=True) if profil_section else None
+    print(f"   👤 Profil: {(offer.profilRecherche or '')[:50]}...")
+    # À propos
+    about_elem = soup.find("div", class_="mt-4 line-clamp-3")
+    if about_elem is None:
+        # Si la classe exacte n'est pas trouvée, essayer une recherche plus large
+        about_elem = soup.find("div", class_=re.compile(r"mt-4"))
+    if about_elem is not None:
+        about_text = about_elem.get_text(separator=" ", strip=True)
+        offer.about = ' '.join(about_text.split()) or None
+    print(f"   📄 About: {(offer.about or '')[:100]}...")
+    offer.pageSource = "Free-Work"
+    return offer
+
+def scrape_freework(start_page=1, end_page=1, mongodb_uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NAME, workers=LISTING_WORKERS, pool=None):
     print("🚀 Démarrage du scraping FreeWork")
     mongo_collection = init_mongodb(mongodb_uri, db_name, collection_name)
     if mongo_collection is None:
         print("⚠️ MongoDB non disponible, les données ne seront pas sauvegardées")
-    driver = create_stealth_driver()
-    total_jobs_count = 0
-    mongo_saved_count = 0
+    # Un pool fourni par l'appelant (mode démon) reste ouvert entre deux exécutions
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool()
+    stats = CrawlStats()
+    retries = RetryQueue("FreeWork")
+    breaker = CircuitBreaker("FreeWork")
+    pagination = {"last_page": None, "end_page": end_page}
+
+    def crawl_page(driver, page_num):
+        print(f"\n{'='*50}")
+        print(f"PAGE FREEWORK {page_num}/{pagination['end_page']}")
+        print(f"{'='*50}")
+        job_links, current_page, items_per_page = scrape_freework_page(driver, page_num)
+        if current_page is None:
+            return PAGE_FAILED
+        if page_num == start_page:
+            pagination["last_page"] = parse_last_page(driver.page_source, "page")
+        if not job_links:
+            print(f"⚠️ Aucune offre trouvée sur la page {page_num}")
+            return PAGE_EMPTY
+        # La page de liste a répondu : libère un éventuel test de reprise avant les pages détaillées
+        breaker.record_success()
+        for idx, job_url in enumerate(job_links, 1):
+            print(f"\n   📋 Offre {idx}/{len(job_links)}")
+            # Le disjoncteur est consulté avant chaque requête de page détaillée (pas pour les offres déjà en base)
+            job_info = extract_freework_job_info(job_url, driver, page_num, idx, mongo_collection, retries, breaker)
+            stats.add(offers=1, saved=1 if job_info else 0)
+            pause(2, 4)
+        return PAGE_OK
+
+    def crawl_retry(driver, item):
+        detail = item[1]
+        job_info = extract_freework_job_info(detail["url"], driver, detail["page"], detail["idx"], mongo_collection)
+        if job_info is not None:
+            stats.add(saved=1 if job_info else 0)
+        return job_info is not None
+
     try:
-        for page_num in range(start_page, end_page + 1):
-            print(f"\n{'='*50}")
-            print(f"PAGE FREEWORK {page_num}/{end_page}")
-            print(f"{'='*50}")
-            job_links, current_page, items_per_page = scrape_freework_page(driver, page_num)
-            if not job_links:
-                print(f"⚠️ Aucune offre trouvée sur la page {page_num}")
-                break
-            for idx, job_url in enumerate(job_links, 1):
-                print(f"\n   📋 Offre {idx}/{len(job_links)}")
-                job_info = extract_freework_job_info(job_url, driver, page_num, idx, mongo_collection)
-                if job_info and job_info.get('idOffre'):
-                    mongo_saved_count += 1
-                total_jobs_count += 1
-                time.sleep(random.uniform(2, 4))
+        crawl_listing("FreeWork", start_page, end_page, workers, pool, crawl_page, pagination, stats,
+                      retries=retries, breaker=breaker, crawl_retry=crawl_retry)
         print(f"\n{'='*50}")
         print(f"📊 RÉSUMÉ DU SCRAPING FREEWORK")
         print(f"{'='*50}")
-        print(f"Pages scrapées: {end_page - start_page + 1}")
-        print(f"Total offres traitées: {total_jobs_count}")
-        print(f"Offres sauvegardées MongoDB: {mongo_saved_count}")
+        print(f"Pages scrapées: {stats.get('pages_ok')} (vides: {stats.get('pages_empty')}, en échec: {stats.get('pages_failed')})")
+        print(f"Total offres traitées: {stats.get('offers')}")
+        print(f"Offres sauvegardées MongoDB: {stats.get('saved')}")
+        print(f"Reprises: {METRICS.snapshot()['counts'].get('FreeWork', {})}")
         print(f"{'='*50}")
     except KeyboardInterrupt:
         print("\n⚠️ Scraping interrompu par l'utilisateur")
     except Exception as e:
         print(f"\n❌ Erreur critique FreeWork: {e}")
     finally:
-        driver.quit()
-        print("✅ Navigateur FreeWork fermé")
+        METRICS.export()
+        if own_pool:
+            pool.quit_all()
+            print("✅ Navigateur FreeWork fermé")
 
 # --- Fonctions HelloWork ---
-def scrape_hellowork_page(driver, page_num, max_retries=3):
-    for attempt in range(max_retries):
+def scrape_hellowork_page(driver, page_num):
+    # None si la page n'a pas pu être chargée (reprise différée par l'appelant), [] si elle ne contient aucune offre
+    try:
+        url = f"{HELLOWORK_BASE_URL}/fr-fr/emploi/recherche.html?p={page_num}"
+        print(f"   🔍 Chargement: {url}")
+        driver.get(url)
+        pause(4, 6)
+        if "403 Forbidden" in driver.page_source or "403" in driver.title:
+            print(f"   ❌ Erreur 403 sur la page {page_num}")
+            return None
         try:
-            url = f"https://www.hellowork.com/fr-fr/emploi/recherche.html?p={page_num}"
-            print(f"   🔍 Chargement: {url}")
-            driver.get(url)
-            wait_time = random.uniform(4, 6)
-            time.sleep(wait_time)
-            if "403 Forbidden" in driver.page_source or "403" in driver.title:
-                print(f"   ❌ Erreur 403 - Tentative {attempt + 1}/{max_retries}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(10, 15))
-                    continue
-                return []
-            wait = WebDriverWait(driver, 15)
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "ul[aria-label='liste des offres']")))
-            except:
-                print(f"   ⚠️ Timeout chargement")
-                if attempt < max_retries - 1:
-                    continue
-                return []
-            total_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_step = total_height // 4
-            for i in range(1, 4):
-                driver.execute_script(f"window.scrollTo(0, {scroll_step * i});")
-                time.sleep(random.uniform(0.5, 1.5))
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_elements = soup.select("li div[data-id-storage-target='item']")
-            if len(job_elements) == 0:
-                job_elements = soup.select("div[data-id-storage-item-id]")
-            print(f"   ✅ {len(job_elements)} offres trouvées")
-            return job_elements
-        except Exception as e:
-            print(f"   ❌ Erreur: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(10)
-            else:
-                return []
-    return []
-
-def extract_hellowork_job_info(job_element, driver, mongo_collection=None):
-    job_info = {"site": "HelloWork"}
-    idOffre = job_element.get('data-id-storage-item-id', 'N/A')
-    job_info["idOffre"] = idOffre
-    print(f"      🆔 ID Offre: {idOffre}")
+            wait_for_selector(driver, "ul[aria-label='liste des offres']", 15)
+        except:
+            print(f"   ⚠️ Timeout chargement")
+            return None
+        total_height = driver.execute_script("return document.body.scrollHeight")
+        scroll_step = total_height // 4
+        for i in range(1, 4):
+            driver.execute_script(f"window.scrollTo(0, {scroll_step * i});")
+            pause(0.5, 1.5)
+        html = driver.page_source
+        archive_page(KIND_HELLOWORK_LISTING, url, html, meta={"page": page_num})
+        offers = parse_hellowork_listing(html)
+        print(f"   ✅ {len(offers)} offres trouvées")
+        return offers
+    except Exception as e:
+        print(f"   ❌ Erreur: {e}")
+        return None
+
+def parse_hellowork_listing(html, reference=None):
+    # Les offres sont extraites tout de suite : seules les valeurs restent en mémoire, pas l'arbre HTML
+    soup = make_soup(html)
+    job_elements = soup.select("li div[data-id-storage-target='item']")
+    if len(job_elements) == 0:
+        job_elements = soup.select("div[data-id-storage-item-id]")
+    return [parse_hellowork_job_element(job_element, reference) for job_element in job_elements]
+
+def parse_hellowork_job_element(job_element, reference=None):
+    offer = JobOffer(site="HelloWork", idOffre=job_element.get('data-id-storage-item-id'))
     title_elem = job_element.select_one('h3.tw-inline > p.tw-typo-l')
-    job_info["titre"] = title_elem.get_text(strip=True) if title_elem else 'N/A'
-    print(f"      📌 Titre: {job_info['titre']}")
+    offer.titre = title_elem.get_text(strip=True) if title_elem else None
     entreprise_elem = job_element.select_one('h3.tw-inline > p.tw-typo-s')
-    job_info["entreprise"] = entreprise_elem.get_text(strip=True) if entreprise_elem else 'N/A'
-    print(f"      🏢 Entreprise: {job_info['entreprise']}")
+    offer.entreprise = entreprise_elem.get_text(strip=True) if entreprise_elem else None
     link_elem = job_element.select_one("a[data-cy='offerTitle']")
     if link_elem and 'href' in link_elem.attrs:
-        job_info["lien"] = f"https://www.hellowork.com{link_elem['href']}"
-    else:
-        job_info["lien"] = 'N/A'
-    if mongo_collection is not None:
-        existing_offer = mongo_collection.find_one({"lien": job_info["lien"]})
-        if existing_offer:
-            print(f"      ℹ️ Offre déjà en base (ID: {idOffre}) - Ignorée")
-            return {}
+        offer.lien = f"{HELLOWORK_BASE_URL}{link_elem['href']}"
     localisation_elem = job_element.select_one("div[data-cy='localisationCard']")
-    job_info["localisation"] = localisation_elem.get_text(strip=True) if localisation_elem else 'N/A'
-    print(f"      📍 Localisation: {job_info['localisation']}")
+    offer.localisation = localisation_elem.get_text(strip=True) if localisation_elem else None
     contrat_elem = job_element.select_one("div[data-cy='contractCard']")
-    job_info["typeContrat"] = contrat_elem.get_text(strip=True) if contrat_elem else 'N/A'
-    print(f"      📄 Contrat: {job_info['typeContrat']}")
+    offer.typeContrat = contrat_elem.get_text(strip=True) if contrat_elem else None
     date_elem = job_element.select_one("div.tw-typo-s.tw-text-grey-500.tw-pl-1.tw-pt-1")
     if date_elem:
-        date_text = date_elem.get_text(strip=True)
-        job_info["datePublication"] = parse_date_publication(date_text)
-        print(f"      📅 Date: {job_info['datePublication']}")
-    else:
-        job_info["datePublication"] = 'N/A'
-    job_info["dateInscriptionBase"] = datetime.now().strftime('%d/%m/%Y')
-    print(f"      🗓️ Inscription: {job_info['dateInscriptionBase']}")
-    if job_info["lien"] != 'N/A':
-        detailed_info = get_hellowork_detailed_job_info(driver, job_info["lien"])
-        job_info.update(detailed_info)
-    else:
-        job_info["salaire"] = 'Non spécifié'
-        job_info["mission"] = 'Non spécifié'
-        job_info["profilRecherche"] = 'Non spécifié'
-        job_info["about"] = 'Non spécifié'
+        offer.datePublication = parse_date_publication(date_elem.get_text(strip=True), reference)
+    offer.dateInscriptionBase = reference or datetime.now(timezone.utc)
+    return offer
+
+def extract_hellowork_job_info(offer, driver, mongo_collection=None, retries=None, breaker=None):
+    # {} si l'offre est déjà en base, None si la page détaillée n'a pas pu être lue (reprise programmée dans `retries`).
+    # Le disjoncteur n'est consulté qu'avant la requête réseau : une offre déjà en base ne prend pas le test de reprise.
+    print(f"      🆔 ID Offre: {offer.idOffre}")
+    print(f"      📌 Titre: {offer.titre}")
+    print(f"      🏢 Entreprise: {offer.entreprise}")
+    print(f"      📍 Localisation: {offer.localisation}")
+    print(f"      📄 Contrat: {offer.typeContrat}")
+    print(f"      📅 Date: {offer.datePublication}")
+    if mongo_collection is not None and offer.lien:
+        existing_offer = mongo_collection.find_one({"lien": offer.lien})
+        if existing_offer:
+            print(f"      ℹ️ Offre déjà en base (ID: {offer.idOffre}) - Ignorée")
+            return {}
+    fetching = breaker is not None and bool(offer.lien)
+    if fetching:
+        breaker.wait()
+    try:
+        completed = complete_hellowork_job_info(offer, driver, mongo_collection)
+    except Exception:
+        if fetching:
+            breaker.record_failure()
+        raise
+    if fetching:
+        if completed is None:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    if completed is None and retries is not None:
+        retries.push(("detail", offer))
+    return completed
+
+def complete_hellowork_job_info(offer, driver, mongo_collection=None):
+    # Sans lien, l'offre est gardée avec les seules informations de la liste
+    if offer.lien:
+        detailed_info = get_hellowork_detailed_job_info(driver, offer.lien)
+        if detailed_info is None:
+            return None
+        offer.update(detailed_info)
     if mongo_collection is not None:
-        save_to_mongodb(mongo_collection, job_info)
-    return job_info
+        save_to_mongodb(mongo_collection, offer)
+    return offer
 
 def get_hellowork_detailed_job_info(driver, job_url):
     print(f"      🔍 Accès à la page détaillée...")
     try:
         driver.get(job_url)
-        time.sleep(random.uniform(3, 5))
+        pause(3, 5)
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.tw-flex.tw-flex-col.tw-gap-4.sm\\:tw-gap-6.tw-col-span-full.lg\\:tw-col-span-8"))
-            )
+            wait_for_selector(driver, "div.tw-flex.tw-flex-col.tw-gap-4.sm\\:tw-gap-6.tw-col-span-full.lg\\:tw-col-span-8", 20)
         except Exception as e:
             print(f"      ⚠️ Erreur chargement : {e}")
-            return {}
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        detailed_info = {}
-        salaire_elem = soup.select_one('button[data-cy="salary-tag-button"]')
-        detailed_info["salaire"] = salaire_elem.get_text(strip=True) if salaire_elem else 'Non spécifié'
-        print(f"      💰 Salaire: {detailed_info['salaire']}")
-        mission_elem = soup.select_one('div[data-truncate-text-target="content"]')
-        if mission_elem:
-            detailed_info["mission"] = mission_elem.get_text(strip=True)
-            print(f"      📋 Mission: {detailed_info['mission'][:60]}...")
-        else:
-            detailed_info["mission"] = 'Non spécifié'
-            print(f"      📋 Mission: Non spécifié")
-        collapsed_div = soup.select_one('div[role="region"][aria-labelledby="collapsed-btn"]')
-        if collapsed_div:
-            paragraphs = collapsed_div.select('p.tw-typo-long-m')
-            if len(paragraphs) >= 2:
-                detailed_info["profilRecherche"] = paragraphs[0].get_text(strip=True)
-                detailed_info["about"] = paragraphs[1].get_text(strip=True)
-                print(f"      👤 Profil: {detailed_info['profilRecherche'][:50]}...")
-                print(f"      🏢 About: {detailed_info['about'][:50]}...")
-            elif len(paragraphs) == 1:
-                detailed_info["profilRecherche"] = paragraphs[0].get_text(strip=True)
-                detailed_info["about"] = 'Non spécifié'
-                print(f"      👤 Profil: {detailed_info['profilRecherche'][:50]}...")
-            else:
-                detailed_info["profilRecherche"] = 'Non spécifié'
-                detailed_info["about"] = 'Non spécifié'
-        else:
-            detailed_info["profilRecherche"] = 'Non spécifié'
-            detailed_info["about"] = 'Non spécifié'
-        print(f"      ✅ Détails extraits")
-        return detailed_info
+            return None
+        html = driver.page_source
+        archive_page(KIND_HELLOWORK_DETAIL, job_url, html)
+        return parse_hellowork_detail(html)
     except Exception as e:
         print(f"      ⚠️ Erreur extraction : {e}")
-        return {}
+        return None
+
+def parse_hellowork_detail(html):
+    soup = make_soup(html)
+    detailed_info = {"salaire": None, "mission": None, "profilRecherche": None, "about": None}
+    salaire_elem = soup.select_one('button[data-cy="salary-tag-button"]')
+    if salaire_elem:
+        detailed_info["salaire"] = salaire_elem.get_text(strip=True)
+    print(f"      💰 Salaire: {detailed_info['salaire']}")
+    mission_elem = soup.select_one('div[data-truncate-text-target="content"]')
+    if mission_elem:
+        detailed_info["mission"] = mission_elem.get_text(strip=True)
+    print(f"      📋 Mission: {(detailed_info['mission'] or '')[:60]}...")
+    collapsed_div = soup.select_one('div[role="region"][aria-labelledby="collapsed-btn"]')
+    if collapsed_div:
+        paragraphs = collapsed_div.select('p.tw-typo-long-m')
+        if len(paragraphs) >= 1:
+            detailed_info["profilRecherche"] = paragraphs[0].get_text(strip=True)
+            print(f"      👤 Profil: {detailed_info['profilRecherche'][:50]}...")
+        if len(paragraphs) >= 2:
+            detailed_info["about"] = paragraphs[1].get_text(strip=True)
+            print(f"      🏢 About: {detailed_info['about'][:50]}...")
+    print(f"      ✅ Détails extraits")
+    return detailed_info
 
-def scrape_hellowork(start_page=1, end_page=1, max_jobs_per_page=None, mongodb_uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NAME):
+def scrape_hellowork(start_page=1, end_page=1, max_jobs_per_page=None, mongodb_uri=MONGODB_URI, db_name=DB_NAME, collection_name=COLLECTION_NAME, workers=LISTING_WORKERS, pool=None):
     print("🚀 Démarrage du scraping HelloWork")
     mongo_collection = init_mongodb(mongodb_uri, db_name, collection_name)
     if mongo_collection is None:
         print("❌ MongoDB non disponible, arrêt du scraping HelloWork")
         return
-    driver = create_stealth_driver()
-    total_jobs_count = 0
-    mongo_saved_count = 0
+    # Un pool fourni par l'appelant (mode démon) reste ouvert entre deux exécutions
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool()
+    stats = CrawlStats()
+    retries = RetryQueue("HelloWork")
+    breaker = CircuitBreaker("HelloWork")
+    pagination = {"last_page": None, "end_page": end_page}
+
+    def crawl_page(driver, page_num):
+        print(f"\n==== PAGE HELLOWORK {page_num}/{pagination['end_page']} ====")
+        jobs = scrape_hellowork_page(driver, page_num)
+        if jobs is None:
+            return PAGE_FAILED
+        if page_num == start_page:
+            pagination["last_page"] = parse_last_page(driver.page_source, "p")
+        if not jobs:
+            print(f"⚠️ Aucune offre sur la page {page_num}")
+            return PAGE_EMPTY
+        if max_jobs_per_page is not None and isinstance(max_jobs_per_page, int):
+            jobs = jobs[:max_jobs_per_page]
+        # La page de liste a répondu : libère un éventuel test de reprise avant les pages détaillées
+        breaker.record_success()
+        for idx, job in enumerate(jobs, 1):
+            print(f"Offre {idx}/{len(jobs)}")
+            # Le disjoncteur est consulté avant chaque requête de page détaillée (pas pour les offres déjà en base)
+            job_info = extract_hellowork_job_info(job, driver, mongo_collection, retries, breaker)
+            stats.add(offers=1)
+            if job_info:
+                stats.add(saved=1 if job_info.idOffre else 0)
+                job_info.pageSource = page_num
+            pause(2, 4)
+        return PAGE_OK
+
+    def crawl_retry(driver, item):
+        job_info = complete_hellowork_job_info(item[1], driver, mongo_collection)
+        if job_info is not None:
+            stats.add(saved=1)
+        return job_info is not None
+
+    def on_drop(item):
+        # Détails introuvables après toutes les reprises : l'offre est gardée avec les informations de la liste
+        if item[0] == "detail":
+            save_to_mongodb(mongo_collection, item[1])
+
     try:
-        for page_num in range(start_page, end_page + 1):
-            print(f"\n==== PAGE HELLOWORK {page_num}/{end_page} ====")
-            jobs = scrape_hellowork_page(driver, page_num)
-            if not jobs:
-                print(f"⚠️ Aucune offre sur la page {page_num}, arrêt du scraping")
-                break
-            if jobs and max_jobs_per_page is not None and isinstance(max_jobs_per_page, int):
-                jobs = jobs[:max_jobs_per_page]
-            for idx, job in enumerate(jobs, 1):
-                print(f"Offre {idx}/{len(jobs)}")
-                job_info = extract_hellowork_job_info(job, driver, mongo_collection)
-                if job_info.get('idOffre') != 'N/A':
-                    mongo_saved_count += 1
-                job_info["pageSource"] = page_num
-                total_jobs_count += 1
-                time.sleep(random.uniform(2, 4))
-        print(f"Pages scrapées: {end_page - start_page + 1}")
-        print(f"Total offres: {total_jobs_count}")
-        print(f"Sauvegardées MongoDB: {mongo_saved_count}")
+        crawl_listing("HelloWork", start_page, end_page, workers, pool, crawl_page, pagination, stats,
+                      retries=retries, breaker=breaker, crawl_retry=crawl_retry, on_drop=on_drop)
+        print(f"Pages scrapées: {stats.get('pages_ok')} (vides: {stats.get('pages_empty')}, en échec: {stats.get('pages_failed')})")
+        print(f"Total offres: {stats.get('offers')}")
+        print(f"Sauvegardées MongoDB: {stats.get('saved')}")
+        print(f"Reprises: {METRICS.snapshot()['counts'].get('HelloWork', {})}")
     except Exception as e:
         print(f"❌ Erreur critique HelloWork: {e}")
     finally:
-        driver.quit()
-        print("✅ Navigateur HelloWork fermé")
+        METRICS.export()
+        if own_pool:
+            pool.quit_all()
+            print("✅ Navigateur HelloWork fermé")
 
 # --- Fonctions principales ---
-def scrape_francetravail(francetravail_client_id, francetravail_client_secret, mongo_collection=None):
+def scrape_francetravail(francetravail_client_id, francetravail_client_secret, mongo_collection=None, min_creation_date=None, max_creation_date=None):
+    # Retourne la couverture de la collecte (None sans token) : `retryable` est vrai si une nouvelle collecte
+    # peut récupérer des offres manquantes (tranches en échec, enregistrement impossible)
     print("🚀 Démarrage du scraping France Travail")
     token = get_francetravail_token(
         client_id=francetravail_client_id,
@@ -552,58 +779,111 @@ def scrape_francetravail(francetravail_client_id, francetravail_client_secret, m
     )
     if not token:
         print("❌ Impossible de récupérer le token France Travail")
-        return
-    offers = search_francetravail_offers_all(token)
+        return None
+    offers, coverage = search_francetravail_offers_all(token, min_creation_date, max_creation_date)
     if offers and mongo_collection is not None:
-        save_francetravail_offers_to_mongodb(offers, mongo_collection)
-        print(f"✅ {len(offers)} offres France Travail sauvegardées")
+        coverage["saveFailures"] = save_francetravail_offers_to_mongodb(offers, mongo_collection)
+        coverage["complete"] = coverage["complete"] and not coverage["saveFailures"]
+        coverage["retryable"] = coverage["retryable"] or bool(coverage["saveFailures"])
+        print(f"✅ {len(offers) - coverage['saveFailures']} offres France Travail sauvegardées")
     else:
         print("⚠️ Aucune offre France Travail trouvée ou pas de connexion MongoDB")
+        coverage["complete"] = coverage["complete"] and mongo_collection is not None
+        coverage["retryable"] = coverage["retryable"] or mongo_collection is None
+    return coverage
 
-def run_scraping():
+def run_scraping(sources=SOURCES, start_page=START_PAGE, end_page=END_PAGE, max_jobs_per_page=MAX_JOBS_PER_PAGE, workers=LISTING_WORKERS):
     mongo_collection = init_mongodb(MONGODB_URI, DB_NAME, COLLECTION_NAME)
     threads = []
     # HelloWork
-    hellowork_thread = threading.Thread(
-        target=scrape_hellowork,
-        kwargs={
-            "start_page": START_PAGE,
-            "end_page": END_PAGE,
-            "max_jobs_per_page": MAX_JOBS_PER_PAGE,
-            "mongodb_uri": MONGODB_URI,
-            "db_name": DB_NAME,
-            "collection_name": COLLECTION_NAME,
-        }
-    )
+    if "hellowork" in sources:
+        threads.append(threading.Thread(
+            target=scrape_hellowork,
+            kwargs={
+                "start_page": start_page,
+                "end_page": end_page,
+                "max_jobs_per_page": max_jobs_per_page,
+                "mongodb_uri": MONGODB_URI,
+                "db_name": DB_NAME,
+                "collection_name": COLLECTION_NAME,
+                "workers": workers,
+            }
+        ))
     # France Travail
-    francetravail_thread = threading.Thread(
-        target=scrape_francetravail,
-        kwargs={
-            "francetravail_client_id": FRANCETRAVAIL_CLIENT_ID,
-            "francetravail_client_secret": FRANCETRAVAIL_CLIENT_SECRET,
-            "mongo_collection": mongo_collection,
-        }
-    )
+    if "francetravail" in sources:
+        threads.append(threading.Thread(
+            target=scrape_francetravail,
+            kwargs={
+                "francetravail_client_id": FRANCETRAVAIL_CLIENT_ID,
+                "francetravail_client_secret": FRANCETRAVAIL_CLIENT_SECRET,
+                "mongo_collection": mongo_collection,
+            }
+        ))
     # FreeWork
-    freework_thread = threading.Thread(
-        target=scrape_freework,
-        kwargs={
-            "start_page": START_PAGE,
-            "end_page": END_PAGE,
-            "mongodb_uri": MONGODB_URI,
-            "db_name": DB_NAME,
-            "collection_name": COLLECTION_NAME,
-        }
-    )
+    if "freework" in sources:
+        threads.append(threading.Thread(
+            target=scrape_freework,
+            kwargs={
+                "start_page": start_page,
+                "end_page": end_page,
+                "mongodb_uri": MONGODB_URI,
+                "db_name": DB_NAME,
+                "collection_name": COLLECTION_NAME,
+                "workers": workers,
+            }
+        ))
     # Lancement des threads
-    threads.append(hellowork_thread)
-    threads.append(francetravail_thread)
-    threads.append(freework_thread)
     for t in threads:
         t.start()
     for t in threads:
         t.join()
     print("🎉 Scraping terminé !")
 
+# --- Rejeu de l'archive ---
+def replay_archive(mongo_collection, kinds=None, since=None, archive=None):
+    # Ré-exécute les extracteurs sur les pages archivées, sans navigateur ni réseau
+    archive = archive or get_archive()
+    if archive is None:
+        print("❌ Archive désactivée (ARCHIVE_DIR vide)")
+        return 0
+    replayed = 0
+    for header, body in archive.records(kinds=kinds, since=since):
+        kind = header["kind"]
+        reference = datetime.fromtimestamp(header["fetchedAt"], timezone.utc)
+        try:
+            if kind == KIND_FRANCETRAVAIL_SEARCH:
+                for offer in json.loads(body).get("resultats", []):
+                    hw_offer = convert_francetravail_to_hellowork(offer)
+                    hw_offer.dateInscriptionBase = reference
+                    upsert_to_mongodb(mongo_collection, hw_offer)
+                    replayed += 1
+            elif kind == KIND_FREEWORK_DETAIL:
+                offer = JobOffer(site="FreeWork", idOffre=freework_offer_id(header["url"]))
+                parse_freework_job_page(body.decode("utf-8"), header["url"], offer, reference)
+                upsert_to_mongodb(mongo_collection, offer)
+                replayed += 1
+            elif kind == KIND_HELLOWORK_LISTING:
+                for offer in parse_hellowork_listing(body.decode("utf-8"), reference):
+                    detail = archive.lookup(offer.lien) if offer.lien else None
+                    if detail is not None:
+                        offer.update(parse_hellowork_detail(detail[1].decode("utf-8")))
+                    upsert_to_mongodb(mongo_collection, offer)
+                    replayed += 1
+        except Exception as e:
+            print(f"⚠️ Erreur rejeu ({header['url']}): {e}")
+    print(f"🔁 Rejeu terminé : {replayed} offres traitées")
+    return replayed
+
+def run_replay(kinds=None, since=None):
+    mongo_collection = init_mongodb(MONGODB_URI, DB_NAME, COLLECTION_NAME)
+    if mongo_collection is None:
+        print("❌ MongoDB non disponible, rejeu annulé")
+        return
+    replay_archive(mongo_collection, kinds=kinds, since=since)
+
 if __name__ == "__main__":
-    run_scraping()
+    # Point d'entrée historique ; voir cli.py pour choisir les sources et les options
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        run_replay()
+    else:
+        run_scraping()
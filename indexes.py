@@ -0,0 +1,104 @@
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import NetworkTimeout, OperationFailure
+
+load_dotenv()
+# --- Configuration ---
+OFFER_TTL_DAYS = os.getenv("OFFER_TTL_DAYS")
+# "strict" : erreur si une requête critique fait un COLLSCAN, "warn" : simple avertissement, "off" : pas de vérification
+INDEX_CHECK_MODE = os.getenv("INDEX_CHECK_MODE", "warn")
+
+# --- Index requis ---
+OFFER_INDEXES = [
+    {"keys": [("idOffre", ASCENDING)], "name": "idOffre_1", "unique": True},
+    {"keys": [("lien", ASCENDING)], "name": "lien_1"},
+    {"keys": [("site", ASCENDING), ("datePublication", DESCENDING)], "name": "site_1_datePublication_-1"},
+    {"keys": [("datePublication", DESCENDING)], "name": "datePublication_-1"},
+    # Offres en attente de CVs (démon) : cvGeneratedAt absent, arrivées depuis le démarrage
+    {"keys": [("cvGeneratedAt", ASCENDING), ("dateInscriptionBase", ASCENDING)], "name": "cvGeneratedAt_1_dateInscriptionBase_1"},
+]
+CV_INDEXES = [
+    {"keys": [("userId", ASCENDING)], "name": "userId_1", "unique": True},
+]
+
+# Requêtes fréquentes dont on vérifie le plan d'exécution
+OFFER_HOT_QUERIES = {
+    "idOffre": {"idOffre": "__index_check__"},
+    "lien": {"lien": "__index_check__"},
+    "site+datePublication": {"site": "__index_check__", "datePublication": {"$gte": datetime(1970, 1, 1)}},
+}
+CV_HOT_QUERIES = {
+    "userId": {"userId": "__index_check__"},
+}
+
+
+def ensure_indexes(collection, specs):
+    # create_index est idempotent : aucun effet si l'index existe déjà avec les mêmes options
+    for spec in specs:
+        options = {k: v for k, v in spec.items() if k != "keys"}
+        try:
+            collection.create_index(spec["keys"], **options)
+        except OperationFailure as e:
+            print(f"❌ Impossible de créer l'index {spec['name']} sur '{collection.name}': {e}")
+            if INDEX_CHECK_MODE == "strict":
+                raise
+        except NetworkTimeout as e:
+            # MONGO_SOCKET_TIMEOUT_MS trop court : la construction se poursuit côté serveur
+            print(f"⚠️ Index {spec['name']} sur '{collection.name}' toujours en construction ({e})")
+
+
+def ensure_ttl_index(collection, ttl_days=OFFER_TTL_DAYS):
+    if not ttl_days:
+        return
+    expire_after = int(float(ttl_days) * 86400)
+    existing = collection.index_information().get("datePublication_1")
+    if existing is None:
+        collection.create_index([("datePublication", ASCENDING)], name="datePublication_1", expireAfterSeconds=expire_after)
+    elif existing.get("expireAfterSeconds") != expire_after:
+        collection.database.command(
+            "collMod", collection.name,
+            index={"name": "datePublication_1", "expireAfterSeconds": expire_after},
+        )
+
+
+def plan_stages(plan):
+    # Parcourt récursivement l'arbre du plan gagnant (inputStage / inputStages / shards)
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan", "winningPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for key in ("inputStages", "shards"):
+        for child in plan.get(key, []):
+            yield from plan_stages(child)
+
+
+def verify_query_plans(collection, queries, mode=INDEX_CHECK_MODE):
+    """Vérifie via explain() que chaque requête critique utilise un index."""
+    if mode == "off":
+        return []
+    collscans = []
+    for label, query in queries.items():
+        winning_plan = collection.find(query).explain().get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(plan_stages(winning_plan)):
+            collscans.append(label)
+            print(f"⚠️ COLLSCAN détecté sur '{collection.name}' pour la requête {label}")
+    if collscans and mode == "strict":
+        raise RuntimeError(f"Requêtes sans index sur '{collection.name}': {', '.join(collscans)}")
+    return collscans
+
+
+def ensure_offer_indexes(collection):
+    ensure_indexes(collection, OFFER_INDEXES)
+    ensure_ttl_index(collection)
+    verify_query_plans(collection, OFFER_HOT_QUERIES)
+
+
+def ensure_cv_indexes(collection):
+    ensure_indexes(collection, CV_INDEXES)
+    verify_query_plans(collection, CV_HOT_QUERIES)
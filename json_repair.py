@@ -0,0 +1,218 @@
+import json
+import re
+import threading
+from collections import Counter
+
+# Défauts rencontrés dans les réponses du modèle, cumulés sur le processus
+DEFECT_STATS = Counter()
+_stats_lock = threading.Lock()
+
+FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def record(defects):
+    with _stats_lock:
+        DEFECT_STATS.update(defects)
+
+
+def defect_report():
+    with _stats_lock:
+        return dict(DEFECT_STATS)
+
+
+def extract_blocks(resp, defects):
+    """Blocs ```json ... ``` (le dernier peut être tronqué), sinon le texte à partir du premier '[' ou '{'."""
+    blocks = [b.strip() for b in FENCE_PATTERN.findall(resp) if b.strip()]
+    if blocks:
+        if len(blocks) > 1:
+            defects["prose_between_fences"] += 1
+        return blocks
+    starts = [i for i in (resp.find("["), resp.find("{")) if i >= 0]
+    if not starts:
+        return []
+    defects["missing_fence"] += 1
+    return [resp[min(starts):].strip()]
+
+
+def fix_commas(text, defects):
+    """Supprime hors chaînes les virgules doublées, initiales (`[,` / `{,`) et finales (`,]` / `,}`)."""
+    out = []
+    in_string = escape = False
+    length = len(text)
+    for i, char in enumerate(text):
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char == ",":
+            j = i + 1
+            while j < length and text[j] in " \t\r\n":
+                j += 1
+            following = text[j] if j < length else ""
+            previous = next((c for c in reversed(out) if c not in " \t\r\n"), "")
+            if following == ",":
+                defects["double_comma"] += 1
+                continue
+            if following in ("]", "}"):
+                defects["trailing_comma"] += 1
+                continue
+            if previous in ("[", "{", ","):
+                defects["leading_comma"] += 1
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def iter_objects(text):
+    """
+    Objets {...} de plus haut niveau, en ignorant le texte parasite entre eux : (texte, complet).
+    Seul le dernier peut être incomplet (réponse coupée).
+    """
+    depth = 0
+    start = None
+    in_string = escape = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            # Les guillemets de la prose hors objets ne comptent pas
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1], True
+                start = None
+    if start is not None:
+        yield text[start:], False
+
+
+def loads_repaired(text, defects):
+    """json.loads, puis après correction des virgules."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    found = Counter()
+    data = json.loads(fix_commas(text, found))
+    defects.update(found)
+    return data
+
+
+def as_objects(data):
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)]
+    if isinstance(data, dict):
+        return [data]
+    return []
+
+
+def parse_objects(resp):
+    """
+    Tous les objets JSON exploitables d'une réponse du modèle. Un bloc qui ne se répare pas
+    dans son ensemble est repris objet par objet : les CVs complets d'un tableau cassé sont conservés,
+    l'objet coupé en fin de réponse est écarté.
+    """
+    if not resp:
+        return []
+    defects = Counter(responses=1)
+    objects = []
+    for block in extract_blocks(resp, defects):
+        try:
+            objects.extend(as_objects(loads_repaired(block, defects)))
+            continue
+        except json.JSONDecodeError:
+            pass
+        for candidate, complete in iter_objects(block):
+            if not complete:
+                defects["truncated_objects"] += 1
+                continue
+            try:
+                objects.extend(as_objects(loads_repaired(candidate, defects)))
+                defects["salvaged_objects"] += 1
+            except json.JSONDecodeError:
+                defects["unrecoverable_objects"] += 1
+    if not objects:
+        defects["empty_responses"] += 1
+    record(defects)
+    return objects
+
+
+class ObjectStream:
+    """
+    Découpe incrémentale d'une réponse reçue par morceaux : chaque objet {...} de plus haut niveau
+    est rendu dès que son accolade fermante arrive. Un objet resté ouvert à `close()`
+    (génération coupée) est écarté.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.defects = Counter(responses=1)
+        self.count = 0
+
+    def _parse(self, text):
+        try:
+            objects = as_objects(loads_repaired(text, self.defects))
+        except json.JSONDecodeError:
+            self.defects["unrecoverable_objects"] += 1
+            return []
+        self.count += len(objects)
+        return objects
+
+    def feed(self, chunk):
+        objects = []
+        for char in chunk:
+            if self.depth == 0:
+                # Hors objet (prose, clôtures ```, crochets du tableau) : on attend une accolade
+                if char == "{":
+                    self.depth = 1
+                    self.buffer = [char]
+                continue
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    objects.extend(self._parse("".join(self.buffer)))
+                    self.buffer = []
+        return objects
+
+    def close(self):
+        if self.depth > 0:
+            self.defects["truncated_objects"] += 1
+        self.buffer = []
+        self.depth = 0
+        self.in_string = self.escape = False
+        if not self.count:
+            self.defects["empty_responses"] += 1
+        record(self.defects)
+        self.defects = Counter()
@@ -0,0 +1,612 @@
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Simulation de bout en bout sans toucher aux vrais sites : des serveurs locaux remplacent
+# HelloWork, FreeWork, l'API France Travail et Mistral, et le pipeline réel (run_scraping,
+# process_offers) tourne contre eux et contre un MongoDB local.
+# Les modules du projet ne sont importés qu'après avoir redirigé leur configuration (variables
+# d'environnement) vers les serveurs simulés : lancer ce script dans un interpréteur dédié.
+
+LOADTEST_MONGODB_URI = os.getenv("LOADTEST_MONGODB_URI", "mongodb://localhost:27017")
+LOADTEST_DB_NAME = os.getenv("LOADTEST_DB_NAME", "scrapemploi_loadtest")
+LOADTEST_REPORT = os.getenv("LOADTEST_REPORT", "loadtest_report.json")
+SIM_TOKEN = "loadtest-token"
+# Limite de l'API France Travail sur le paramètre range
+FRANCETRAVAIL_MAX_RANGE = 3149
+
+TITRES = ("Développeur Python", "Développeur Java", "Data Engineer", "Comptable", "Chef de projet",
+          "Technicien réseau", "Commercial B2B", "Cariste", "Infirmier", "Administrateur Linux")
+ENTREPRISES = ("Acme", "Globex", "Initech", "Umbrella", "Soylent", "Hooli", "Stark", "Wayne")
+# "France (99)" : offres sans département métropolitain ni d'outre-mer
+VILLES = ("Paris (75)", "Lyon (69)", "Marseille (13)", "Lille (59)", "Nantes (44)", "Bordeaux (33)", "France (99)")
+CONTRATS = ("CDI", "CDD", "Intérim", "Freelance")
+ID_PREFIXES = {"hellowork": "HW", "freework": "FW", "francetravail": "FT"}
+COMPETENCES = ("python", "java", "sql", "docker", "kubernetes", "aws", "excel", "sap", "agile",
+               "gestion de projet", "comptabilité", "cisco", "linux", "anglais", "caces")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(len(sorted_values) * q) - 1))]
+
+
+# --- Comportement des serveurs simulés ---
+class Behaviour:
+    """Latence (ms, avec gigue) et taux de réponses en erreur (5xx) ou refusées (403) d'un serveur simulé."""
+
+    def __init__(self, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, forbidden_rate=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self.rng = random.Random()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, default):
+        # "latency=200,jitter=50,errors=0.02,forbidden=0.05" ; les clés absentes reprennent `default`
+        values = {"latency": default.latency_ms, "jitter": default.jitter_ms,
+                  "errors": default.error_rate, "forbidden": default.forbidden_rate}
+        for part in filter(None, (spec or "").split(",")):
+            key, _, value = part.partition("=")
+            if key.strip() not in values:
+                raise ValueError(f"Paramètre de comportement inconnu : {key}")
+            values[key.strip()] = float(value)
+        return cls(values["latency"], values["jitter"], values["errors"], values["forbidden"])
+
+    def delay(self):
+        with self.lock:
+            return max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+
+    def outcome(self):
+        with self.lock:
+            draw = self.rng.random()
+        if draw < self.forbidden_rate:
+            return 403
+        if draw < self.forbidden_rate + self.error_rate:
+            return 503
+        return 200
+
+
+class RequestLog:
+    """Requêtes reçues par les serveurs simulés : (service, statut, durée en ms)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+
+    def add(self, service, status, ms):
+        with self.lock:
+            self.entries.append((service, status, ms))
+
+    def summary(self):
+        with self.lock:
+            entries = list(self.entries)
+        report = {}
+        for service in sorted({e[0] for e in entries}):
+            timings = sorted(e[2] for e in entries if e[0] == service)
+            statuses = {}
+            for e in entries:
+                if e[0] == service:
+                    statuses[str(e[1])] = statuses.get(str(e[1]), 0) + 1
+            report[service] = {
+                "requests": len(timings),
+                "statuses": statuses,
+                "p50_ms": round(percentile(timings, 0.5), 1),
+                "p95_ms": round(percentile(timings, 0.95), 1),
+                "p99_ms": round(percentile(timings, 0.99), 1),
+                "max_ms": round(timings[-1], 1),
+            }
+        return report
+
+
+class StandInServer:
+    """
+    Serveur HTTP local (thread dédié) : `routes` associe (méthode, expression régulière du chemin)
+    à un gestionnaire `handler(request, match)` qui renvoie (statut, en-têtes, corps) ;
+    un corps itérable est envoyé morceau par morceau (flux SSE).
+    """
+
+    def __init__(self, name, behaviour, log, routes):
+        self.name = name
+        self.behaviour = behaviour
+        self.log = log
+        self.routes = [(method, re.compile(pattern), handler) for method, pattern, handler in routes]
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.handle(self, "GET")
+
+            def do_POST(self):
+                stand_in.handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name=f"standin-{self.name}", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def handle(self, request, method):
+        start = time.perf_counter()
+        url = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        request.body = request.rfile.read(length) if length else b""
+        request.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        time.sleep(self.behaviour.delay())
+        status = self.behaviour.outcome()
+        if status == 403:
+            response = (403, {"Content-Type": "text/html"}, "<html><head><title>403 Forbidden</title></head><body>403 Forbidden</body></html>")
+        elif status == 503:
+            response = (503, {"Content-Type": "text/plain"}, "Service Unavailable")
+        else:
+            response = (404, {"Content-Type": "text/plain"}, "not found")
+            for route_method, pattern, handler in self.routes:
+                match = pattern.fullmatch(url.path)
+                if route_method == method and match:
+                    response = handler(request, match)
+                    break
+        status, headers, body = response
+        try:
+            request.send_response(status)
+            for key, value in headers.items():
+                request.send_header(key, value)
+            if isinstance(body, (str, bytes)):
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                request.send_header("Content-Length", str(len(data)))
+                request.end_headers()
+                request.wfile.write(data)
+            else:
+                request.end_headers()
+                for chunk in body:
+                    request.wfile.write(chunk.encode("utf-8"))
+                    request.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.log.add(self.name, status, (time.perf_counter() - start) * 1000)
+
+
+# --- Jeux de données synthétiques (fixtures) ---
+class FixtureCorpus:
+    """Offres déterministes (graine fixe) servies par les trois sources simulées."""
+
+    def __init__(self, pages, offers_per_page, francetravail_offers, seed=42):
+        self.pages = pages
+        self.offers_per_page = offers_per_page
+        self.francetravail_offers = francetravail_offers
+        self.seed = seed
+        # Dates de création en UTC, comme l'API (suffixe Z)
+        self.reference = datetime.now(timezone.utc).replace(microsecond=0, tzinfo=None)
+        self.francetravail_index = None
+        self.index_lock = threading.Lock()
+
+    def offer(self, source, number):
+        rng = random.Random(f"{self.seed}-{source}-{number}")
+        skills = rng.sample(COMPETENCES, 4)
+        return {
+            "id": f"{ID_PREFIXES[source]}{number:07d}",
+            "titre": rng.choice(TITRES),
+            "entreprise": rng.choice(ENTREPRISES),
+            "ville": rng.choice(VILLES),
+            "contrat": rng.choice(CONTRATS),
+            "salaire": f"{rng.randint(28, 70)}k € brut annuel",
+            "jours": rng.randint(0, 29),
+            "mission": f"Vous rejoignez une équipe de {rng.randint(3, 30)} personnes. " + " ".join(
+                f"Vous travaillerez avec {skill} au quotidien." for skill in skills),
+            "profil": "Maîtrise de " + ", ".join(skills) + ".",
+            "about": f"{rng.choice(ENTREPRISES)} est une entreprise de {rng.randint(10, 5000)} salariés.",
+            "skills": skills,
+        }
+
+    def page_offers(self, source, page):
+        if page < 1 or page > self.pages:
+            return []
+        first = (page - 1) * self.offers_per_page
+        return [self.offer(source, n) for n in range(first, first + self.offers_per_page)]
+
+    def pagination(self, param):
+        return "".join(f'<a href="?{param}={p}">{p}</a>' for p in range(1, self.pages + 1))
+
+    # HelloWork : mêmes sélecteurs que parse_hellowork_listing / parse_hellowork_detail
+    def hellowork_listing(self, page):
+        items = "".join(f"""
+<li><div data-id-storage-target="item" data-id-storage-item-id="{o['id']}">
+  <h3 class="tw-inline"><p class="tw-typo-l">{html.escape(o['titre'])}</p><p class="tw-typo-s">{o['entreprise']}</p></h3>
+  <a data-cy="offerTitle" href="/fr-fr/emplois/{o['id']}.html">{html.escape(o['titre'])}</a>
+  <div data-cy="localisationCard">{o['ville']}</div>
+  <div data-cy="contractCard">{o['contrat']}</div>
+  <div class="tw-typo-s tw-text-grey-500 tw-pl-1 tw-pt-1">il y a {o['jours']} jours</div>
+</div></li>""" for o in self.page_offers("hellowork", page))
+        return f"""<html><head><title>Offres d'emploi</title></head><body>
+<ul aria-label="liste des offres">{items}</ul><nav>{self.pagination('p')}</nav></body></html>"""
+
+    def hellowork_detail(self, offer_id):
+        o = self.offer("hellowork", int(offer_id[2:]))
+        return f"""<html><head><title>{html.escape(o['titre'])}</title></head><body>
+<div class="tw-flex tw-flex-col tw-gap-4 sm:tw-gap-6 tw-col-span-full lg:tw-col-span-8">
+  <button data-cy="salary-tag-button">{o['salaire']}</button>
+  <div data-truncate-text-target="content">{html.escape(o['mission'])}</div>
+  <div role="region" aria-labelledby="collapsed-btn">
+    <p class="tw-typo-long-m">{html.escape(o['profil'])}</p><p class="tw-typo-long-m">{html.escape(o['about'])}</p>
+  </div>
+</div></body></html>"""
+
+    # FreeWork : mêmes sélecteurs que parse_freework_listing / parse_freework_job_page
+    def freework_listing(self, page):
+        links = "".join(f'<a href="/fr/tech-it/dev/job-mission/{o["id"]}">{html.escape(o["titre"])}</a>'
+                        for o in self.page_offers("freework", page))
+        return f"<html><head><title>Free-Work</title></head><body>{links}<nav>{self.pagination('page')}</nav></body></html>"
+
+    def freework_detail(self, offer_id):
+        o = self.offer("freework", int(offer_id[2:]))
+        return f"""<html><head><title>{html.escape(o['titre'])}</title></head><body>
+<h1>{html.escape(o['titre'])}<em>Nouveau</em></h1><p class="font-semibold text-sm">{o['entreprise']}</p>
+<div class="tags relative w-full"><span class="tag">{o['contrat']}</span></div>
+<div class="flex items-center py-1"><svg></svg>{o['ville']}</div>
+<div class="flex items-center py-1">{o['salaire']}</div>
+<time>Publiée il y a {o['jours']} jours</time>
+<div class="description">{html.escape(o['mission'])}</div>
+<h2>Profil recherché</h2><div>{html.escape(o['profil'])}</div>
+<div class="mt-4 line-clamp-3">{html.escape(o['about'])}</div></body></html>"""
+
+    # France Travail : format de offres/search
+    def francetravail_created(self, o, number):
+        # Millisecondes comme l'API : les bornes minCreationDate/maxCreationDate sont à la seconde
+        return self.reference - timedelta(days=o["jours"], minutes=number % 1440, milliseconds=number * 137 % 1000)
+
+    def francetravail_matches(self, min_date, max_date, departement):
+        """Numéros des offres France Travail correspondant aux filtres de date et de département."""
+        with self.index_lock:
+            if self.francetravail_index is None:
+                self.francetravail_index = []
+                for number in range(self.francetravail_offers):
+                    o = self.offer("francetravail", number)
+                    self.francetravail_index.append((self.francetravail_created(o, number), o["ville"][-3:-1], number))
+        return [number for created, code, number in self.francetravail_index
+                if (min_date is None or created >= min_date) and (max_date is None or created <= max_date)
+                and (departement is None or code in departement.split(","))]
+
+    def francetravail_offer(self, number):
+        o = self.offer("francetravail", number)
+        created = self.francetravail_created(o, number)
+        return {
+            "id": o["id"],
+            "intitule": o["titre"],
+            "description": o["mission"],
+            "dateCreation": created.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+            "lieuTravail": {"libelle": o["ville"], "codePostal": o["ville"][-3:-1] + "000"},
+            "entreprise": {"nom": o["entreprise"], "description": o["about"]},
+            "typeContratLibelle": o["contrat"],
+            "salaire": {"libelle": o["salaire"]},
+            "competences": [{"libelle": skill} for skill in o["skills"]],
+            "origineOffre": {"urlOrigine": f"https://candidat.francetravail.fr/offres/recherche/detail/{o['id']}"},
+        }
+
+
+# --- Serveurs simulés ---
+def html_response(body):
+    return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+
+def hellowork_server(corpus, behaviour, log):
+    return StandInServer("hellowork", behaviour, log, [
+        ("GET", r"/fr-fr/emploi/recherche\.html", lambda req, m: html_response(corpus.hellowork_listing(int(req.query.get("p", 1))))),
+        ("GET", r"/fr-fr/emplois/(HW\d+)\.html", lambda req, m: html_response(corpus.hellowork_detail(m.group(1)))),
+    ])
+
+
+def freework_server(corpus, behaviour, log):
+    return StandInServer("freework", behaviour, log, [
+        ("GET", r"/fr/tech-it/jobs", lambda req, m: html_response(corpus.freework_listing(int(req.query.get("page", 1))))),
+        ("GET", r"/fr/tech-it/[^/]+/job-mission/(FW\d+)", lambda req, m: html_response(corpus.freework_detail(m.group(1)))),
+    ])
+
+
+def francetravail_server(corpus, behaviour, log):
+    def token(req, match):
+        if b"client_id=" not in req.body:
+            return 400, {"Content-Type": "application/json"}, json.dumps({"error": "invalid_request"})
+        return 200, {"Content-Type": "application/json"}, json.dumps(
+            {"access_token": SIM_TOKEN, "token_type": "Bearer", "expires_in": 1499})
+
+    def search(req, match):
+        if req.headers.get("Authorization") != f"Bearer {SIM_TOKEN}":
+            return 401, {"Content-Type": "application/json"}, json.dumps({"message": "Unauthorized"})
+        first, _, last = req.query.get("range", "0-149").partition("-")
+        first, last = int(first), int(last or first)
+        if last < first or last - first >= 150 or last > FRANCETRAVAIL_MAX_RANGE:
+            return 400, {"Content-Type": "application/json"}, json.dumps({"message": "Valeur du paramètre range incorrecte"})
+        def date(name):
+            value = req.query.get(name)
+            return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ") if value else None
+
+        matches = corpus.francetravail_matches(date("minCreationDate"), date("maxCreationDate"), req.query.get("departement"))
+        total = len(matches)
+        if first >= total:
+            return 204, {}, b""
+        last = min(last, total - 1)
+        results = [corpus.francetravail_offer(n) for n in matches[first:last + 1]]
+        headers = {"Content-Type": "application/json", "Content-Range": f"offres {first}-{last}/{total}"}
+        return 206 if last < total - 1 or first > 0 else 200, headers, json.dumps({"resultats": results})
+
+    return StandInServer("francetravail", behaviour, log, [
+        ("POST", r"/connexion/oauth2/access_token", token),
+        ("GET", r"/partenaire/offresdemploi/v2/offres/search", search),
+    ])
+
+
+def mistral_server(behaviour, log, tokens_per_second=200.0, defect_rate=0.0, truncate_rate=0.0):
+    rng = random.Random(7)
+    lock = threading.Lock()
+
+    def completion_text(prompt, max_tokens):
+        titre = re.search(r"Titre: (.*)", prompt)
+        label = titre.group(1).strip() if titre else "Poste"
+        cvs = []
+        for level, years in (("junior", 1), ("intermédiaire", 4), ("senior", 8)):
+            cvs.append({
+                "userId": str(uuid.uuid4()),
+                "basics": {"name": f"Candidat {level}", "label": label, "email": f"{level}@example.com",
+                           "summary": f"Profil {level} avec {years} ans d'expérience."},
+                "work": [{"position": label, "company": "Acme", "startDate": f"{2025 - years}-01"}],
+                "education": [{"institution": "Université", "studyType": "Master"}],
+                "skills": [{"name": "python"}, {"name": "sql"}],
+                "languages": [{"language": "Français", "fluency": "Natif"}],
+            })
+        text = "```json\n" + json.dumps(cvs, ensure_ascii=False, indent=2) + "\n```"
+        with lock:
+            defective, truncated = rng.random() < defect_rate, rng.random() < truncate_rate
+        if defective:
+            # Défaut typique du modèle : virgule doublée après userId
+            text = text.replace('",\n', '",,\n', 1)
+        finish_reason = "stop"
+        # ~4 caractères par jeton
+        limit = max_tokens * 4
+        if truncated:
+            limit = min(limit, int(len(text) * 0.8))
+        if len(text) > limit:
+            text, finish_reason = text[:limit], "length"
+        return text, finish_reason
+
+    def chat(req, match):
+        payload = json.loads(req.body or b"{}")
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        text, finish_reason = completion_text(prompt, payload.get("max_tokens", 2000))
+        delay_per_char = 1 / (tokens_per_second * 4)
+        if not payload.get("stream"):
+            time.sleep(len(text) * delay_per_char)
+            return 200, {"Content-Type": "application/json"}, json.dumps({
+                "id": str(uuid.uuid4()), "object": "chat.completion", "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}],
+            })
+
+        def events():
+            for i in range(0, len(text), 16):
+                time.sleep(16 * delay_per_char)
+                chunk = {"choices": [{"index": 0, "delta": {"content": text[i:i + 16]}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return 200, {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}, events()
+
+    return StandInServer("mistral", behaviour, log, [("POST", r"/v1/chat/completions", chat)])
+
+
+# --- Mesure des ressources ---
+class ResourceSampler:
+    """Échantillonne périodiquement la mémoire résidente et le nombre de threads du processus."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.samples = []
+        self.thread = threading.Thread(target=self.run, name="resource-sampler", daemon=True)
+
+    @staticmethod
+    def rss_mb():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.samples.append((self.rss_mb(), threading.active_count()))
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        rss = [s[0] for s in self.samples if s[0] is not None]
+        report = {"peak_threads": max((s[1] for s in self.samples), default=None),
+                  "peak_rss_mb": round(max(rss), 1) if rss else None}
+        try:
+            import resource
+            for who, name in ((resource.RUSAGE_SELF, "process"), (resource.RUSAGE_CHILDREN, "children")):
+                usage = resource.getrusage(who)
+                report[name] = {"cpu_user_s": round(usage.ru_utime, 2), "cpu_system_s": round(usage.ru_stime, 2),
+                                "max_rss_mb": round(usage.ru_maxrss / 1024, 1)}
+        except ImportError:
+            pass
+        return report
+
+
+# --- Exécution ---
+def simulation_env(servers, args, work_dir):
+    return {
+        "MONGODB_URI": args.mongo_uri,
+        "DB_NAME": args.db_name,
+        "COLLECTION_NAME": "job_offers",
+        # CVs dans la même base locale : ne jamais écrire dans la base configurée par .env
+        "MONGO_CV": args.mongo_uri,
+        "DB_CV": args.db_name,
+        "COLLECTION_CV": "resume",
+        "HELLOWORK_BASE_URL": servers["hellowork"].url,
+        "FREEWORK_BASE_URL": servers["freework"].url,
+        "FRANCETRAVAIL_TOKEN_URL": servers["francetravail"].url + "/connexion/oauth2/access_token",
+        "FRANCETRAVAIL_SEARCH_URL": servers["francetravail"].url + "/partenaire/offresdemploi/v2/offres/search",
+        "FRANCETRAVAIL_CLIENT_ID": "loadtest",
+        "FRANCETRAVAIL_CLIENT_SECRET": "loadtest",
+        "FRANCETRAVAIL_GRANT_TYPE": "client_credentials",
+        "FRANCETRAVAIL_SCOPE": "api_offresdemploiv2 o2dsoffre",
+        "FRANCETRAVAIL_REALM": "/partenaire",
+        "MISTRAL_API_URL": servers["mistral"].url + "/v1/chat/completions",
+        "MISTRAL_API_KEY": "loadtest",
+        "MISTRAL_CALL_DELAY": str(args.mistral_call_delay),
+        "MISTRAL_STREAM": "false" if args.no_stream else "true",
+        "SCRAPE_DELAY_SCALE": str(args.delay_scale),
+        "RETRY_BASE_DELAY": str(15 * args.delay_scale),
+        "RETRY_MAX_DELAY": str(600 * args.delay_scale),
+        "BREAKER_COOLDOWN": str(120 * args.delay_scale),
+        "LISTING_WORKERS": str(args.workers),
+        "ARCHIVE_DIR": os.path.join(work_dir, "archive"),
+        "RETRY_METRICS_FILE": os.path.join(work_dir, "retry_metrics.json"),
+    }
+
+
+def run_simulation(args):
+    log = RequestLog()
+    default = Behaviour(args.latency_ms, args.jitter_ms)
+    corpus = FixtureCorpus(args.pages, args.offers_per_page, args.francetravail_offers)
+    servers = {
+        "hellowork": hellowork_server(corpus, Behaviour.parse(args.hellowork, default), log),
+        "freework": freework_server(corpus, Behaviour.parse(args.freework, default), log),
+        "francetravail": francetravail_server(corpus, Behaviour.parse(args.francetravail, default), log),
+        "mistral": mistral_server(Behaviour.parse(args.mistral, default), log, args.mistral_tps,
+                                  args.mistral_defects, args.mistral_truncate),
+    }
+    for server in servers.values():
+        server.start()
+    work_dir = tempfile.mkdtemp(prefix="scrapemploi-loadtest-")
+    os.environ.update(simulation_env(servers, args, work_dir))
+
+    # Imports après redirection de la configuration
+    import cv
+    import index
+    from mongo_clients import get_client
+
+    client = get_client(args.mongo_uri)
+    if not args.keep:
+        client.drop_database(args.db_name)
+    offers_collection = client[args.db_name]["job_offers"]
+    cv_collection = client[args.db_name]["resume"]
+    sampler = ResourceSampler().start()
+    report = {"startedAt": datetime.now().isoformat(), "config": vars(args), "stages": {}}
+    try:
+        if args.sources:
+            start = time.perf_counter()
+            before = offers_collection.estimated_document_count()
+            index.run_scraping(sources=args.sources, start_page=1, end_page=args.pages,
+                               max_jobs_per_page=None, workers=args.workers)
+            elapsed = time.perf_counter() - start
+            inserted = offers_collection.estimated_document_count() - before
+            report["stages"]["scraping"] = {"seconds": round(elapsed, 2), "offers_inserted": inserted,
+                                            "offers_per_second": round(inserted / elapsed, 2) if elapsed else None}
+        if args.cv_offers:
+            offers = list(offers_collection.find({}).limit(args.cv_offers))
+            start = time.perf_counter()
+            before = cv_collection.estimated_document_count()
+            cv.process_offers(offers, stream=not args.no_stream)
+            elapsed = time.perf_counter() - start
+            inserted = cv_collection.estimated_document_count() - before
+            report["stages"]["cv_generation"] = {
+                "seconds": round(elapsed, 2), "offers": len(offers), "cvs_inserted": inserted,
+                "offers_per_second": round(len(offers) / elapsed, 3) if elapsed else None,
+                "json_repairs": cv.defect_report()}
+    finally:
+        report["resources"] = sampler.stop()
+        report["requests"] = log.summary()
+        for server in servers.values():
+            server.stop()
+    return report
+
+
+def print_report(report):
+    print(f"\n{'='*80}\nRAPPORT DE CHARGE\n{'='*80}")
+    for stage, values in report["stages"].items():
+        print(f"⏱️ {stage}: " + ", ".join(f"{k}={v}" for k, v in values.items() if k != "json_repairs"))
+        if values.get("json_repairs"):
+            print(f"   Réparations JSON : {values['json_repairs']}")
+    for service, values in report["requests"].items():
+        print(f"🌐 {service}: {values['requests']} requêtes {values['statuses']} | p50 {values['p50_ms']} ms, "
+              f"p95 {values['p95_ms']} ms, p99 {values['p99_ms']} ms, max {values['max_ms']} ms")
+    resources = report["resources"]
+    print(f"🧠 Threads max: {resources.get('peak_threads')}, RSS max: {resources.get('peak_rss_mb')} Mo")
+    for name in ("process", "children"):
+        if name in resources:
+            print(f"   CPU {name}: {resources[name]}")
+    print("=" * 80)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Test de charge du pipeline contre des serveurs simulés et un MongoDB local")
+    parser.add_argument("--sources", nargs="*", choices=["hellowork", "francetravail", "freework"], default=["francetravail"],
+                        help="Sources à collecter (HelloWork/FreeWork nécessitent Chrome)")
+    parser.add_argument("--pages", type=int, default=5, help="Pages de liste servies par HelloWork/FreeWork")
+    parser.add_argument("--offers-per-page", type=int, default=20)
+    parser.add_argument("--francetravail-offers", type=int, default=1000)
+    parser.add_argument("--cv-offers", type=int, default=10, help="Offres passées à process_offers (0 = aucune)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de liste par site")
+    parser.add_argument("--delay-scale", type=float, default=0.05, help="Multiplicateur des pauses et délais de reprise")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    behaviour_help = "latency=MS,jitter=MS,errors=TAUX,forbidden=TAUX"
+    for service in ("hellowork", "freework", "francetravail", "mistral"):
+        parser.add_argument(f"--{service}", default="", metavar="SPEC", help=f"Comportement du serveur {service} : {behaviour_help}")
+    parser.add_argument("--mistral-tps", type=float, default=200, help="Jetons par seconde générés par Mistral simulé")
+    parser.add_argument("--mistral-defects", type=float, default=0.1, help="Part des réponses avec virgule doublée")
+    parser.add_argument("--mistral-truncate", type=float, default=0.05, help="Part des réponses tronquées")
+    parser.add_argument("--mistral-call-delay", type=float, default=0.0)
+    parser.add_argument("--no-stream", action="store_true")
+    parser.add_argument("--mongo-uri", default=LOADTEST_MONGODB_URI)
+    parser.add_argument("--db-name", default=LOADTEST_DB_NAME)
+    parser.add_argument("--keep", action="store_true", help="Ne pas vider la base de test avant l'exécution")
+    parser.add_argument("--report", default=LOADTEST_REPORT)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    result = run_simulation(arguments)
+    print_report(result)
+    with open(arguments.report, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📄 Rapport écrit dans {arguments.report}")
+    sys.exit(0)
@@ -0,0 +1,53 @@
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from indexes import ensure_offer_indexes
+from mongo_clients import get_collection
+
+load_dotenv()
+# --- Configuration ---
+MONGODB_URI = os.getenv("MONGODB_URI")
+DB_NAME = os.getenv("DB_NAME")
+COLLECTION_NAME = os.getenv("COLLECTION_NAME")
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))
+
+DATE_FIELDS = ("datePublication", "dateInscriptionBase")
+
+
+def parse_legacy_date(value):
+    # Anciennes valeurs : '%d/%m/%Y' ou 'N/A'
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.strptime(value.strip(), '%d/%m/%Y')
+    except (AttributeError, ValueError):
+        return None
+
+
+def migrate_offer_dates(collection, batch_size=MIGRATION_BATCH_SIZE):
+    """Convertit les dates stockées en chaînes '%d/%m/%Y' en dates BSON natives."""
+    query = {"$or": [{field: {"$type": "string"}} for field in DATE_FIELDS]}
+    projection = {field: 1 for field in DATE_FIELDS}
+    operations = []
+    migrated = 0
+    for doc in collection.find(query, projection, batch_size=batch_size):
+        update = {field: parse_legacy_date(doc.get(field)) for field in DATE_FIELDS if field in doc}
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        if len(operations) >= batch_size:
+            migrated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+            print(f"   🔄 {migrated} offres migrées...")
+    if operations:
+        migrated += collection.bulk_write(operations, ordered=False).modified_count
+    print(f"✅ Migration des dates terminée : {migrated} offres converties")
+    return migrated
+
+
+if __name__ == "__main__":
+    collection = get_collection(MONGODB_URI, DB_NAME, COLLECTION_NAME)
+    migrate_offer_dates(collection)
+    ensure_offer_indexes(collection)
+    print("✅ Index en place")
@@ -0,0 +1,61 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+load_dotenv()
+# --- Configuration ---
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+# Sans limite par défaut (comme pymongo) : un create_index sur une grosse collection peut durer plusieurs minutes
+MONGO_SOCKET_TIMEOUT_MS = os.getenv("MONGO_SOCKET_TIMEOUT_MS")
+
+# Un seul MongoClient (et donc un seul pool) par URI pour tout le processus
+_clients = {}
+_ready = set()
+_lock = threading.Lock()
+
+
+def get_client(uri):
+    """Retourne le client partagé pour cette URI, créé au premier appel."""
+    client = _clients.get(uri)
+    if client is not None:
+        return client
+    with _lock:
+        if uri not in _clients:
+            _clients[uri] = MongoClient(
+                uri,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=int(MONGO_SOCKET_TIMEOUT_MS) if MONGO_SOCKET_TIMEOUT_MS else None,
+                connect=False,
+            )
+        return _clients[uri]
+
+
+def get_collection(uri, db_name, collection_name):
+    return get_client(uri)[db_name][collection_name]
+
+
+def ping(uri):
+    # Test de disponibilité peu coûteux, fait une seule fois par URI
+    if uri in _ready:
+        return True
+    get_client(uri).admin.command("ping")
+    _ready.add(uri)
+    return True
+
+
+def close_all():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _ready.clear()
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Optional, Union
+
+
+class JobOffer:
+    """
+    Offre d'emploi normalisée, produite par les trois sources (HelloWork, FreeWork, France Travail).
+    Les champs absents valent None ; la conversion en document MongoDB n'a lieu qu'à l'enregistrement.
+    `__slots__` évite un dict par offre sur les longues collectes.
+    """
+
+    __slots__ = (
+        "site",
+        "idOffre",
+        "titre",
+        "entreprise",
+        "lien",
+        "localisation",
+        "typeContrat",
+        "datePublication",
+        "dateInscriptionBase",
+        "salaire",
+        "mission",
+        "profilRecherche",
+        "about",
+        "pageSource",
+        "skills",
+    )
+
+    site: str
+    idOffre: Optional[str]
+    titre: Optional[str]
+    entreprise: Optional[str]
+    lien: Optional[str]
+    localisation: Optional[str]
+    typeContrat: Optional[str]
+    datePublication: Optional[datetime]
+    dateInscriptionBase: Optional[datetime]
+    salaire: Optional[str]
+    mission: Optional[str]
+    profilRecherche: Optional[str]
+    about: Optional[str]
+    pageSource: Optional[Union[str, int]]
+    skills: Optional[List[str]]
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Champs inconnus pour JobOffer : {', '.join(fields)}")
+
+    def update(self, fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def to_document(self):
+        # Les champs absents ne sont pas écrits (les lecteurs utilisent .get(champ, défaut))
+        return {name: value for name in self.__slots__ if (value := getattr(self, name)) is not None}
+
+    def __repr__(self):
+        return f"JobOffer(site={self.site!r}, idOffre={self.idOffre!r}, titre={self.titre!r})"
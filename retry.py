@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# --- Configuration ---
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 15))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 600))
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 4))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", 60))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 120))
+RETRY_METRICS_FILE = os.getenv("RETRY_METRICS_FILE", "retry_metrics.json")
+# Éléments abandonnés gardés en exemple par site (les compteurs restent exacts) : mémoire bornée en mode démon
+RETRY_DROPPED_SAMPLE = int(os.getenv("RETRY_DROPPED_SAMPLE", 100))
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, maximum=RETRY_MAX_DELAY):
+    # Backoff exponentiel avec "full jitter" : uniforme dans [base/2, min(max, base * 2^attempt)]
+    ceiling = min(maximum, base * (2 ** attempt))
+    return random.uniform(min(base / 2, ceiling), ceiling)
+
+
+def describe_item(item):
+    # Identifiant compact d'un élément abandonné (URL, id ou numéro de page), pas l'offre complète
+    kind, payload = item if isinstance(item, tuple) and len(item) == 2 else ("item", item)
+    if isinstance(payload, dict):
+        payload = payload.get("url") or payload.get("idOffre")
+    else:
+        payload = getattr(payload, "lien", None) or getattr(payload, "idOffre", None) or payload
+    return f"{kind}:{payload}"
+
+
+class RetryMetrics:
+    def __init__(self, sample_size=RETRY_DROPPED_SAMPLE):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.dropped = {}
+        self.sample_size = sample_size
+
+    def add(self, site, key, value=1):
+        with self.lock:
+            site_counts = self.counts.setdefault(site, {})
+            site_counts[key] = site_counts.get(key, 0) + value
+
+    def drop(self, site, item):
+        self.add(site, "dropped")
+        with self.lock:
+            self.dropped.setdefault(site, deque(maxlen=self.sample_size)).append(describe_item(item))
+
+    def snapshot(self):
+        with self.lock:
+            return {"counts": json.loads(json.dumps(self.counts)), "dropped": {site: list(items) for site, items in self.dropped.items()}}
+
+    def export(self, path=RETRY_METRICS_FILE):
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ Erreur export métriques de reprise: {e}")
+
+
+METRICS = RetryMetrics()
+
+
+class RetryQueue:
+    """
+    File de reprise différée : un élément en échec est reprogrammé avec un backoff exponentiel
+    et ne bloque pas le worker, qui continue avec les autres URLs en attendant l'échéance.
+    """
+
+    def __init__(self, site, max_attempts=RETRY_MAX_ATTEMPTS, metrics=METRICS):
+        self.site = site
+        self.max_attempts = max_attempts
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.heap = []
+        self.counter = itertools.count()
+
+    def push(self, item, attempt=0):
+        """Programme une reprise ; retourne False (élément abandonné) si le nombre max de tentatives est atteint."""
+        if attempt >= self.max_attempts:
+            print(f"❌ [{self.site}] Abandon après {attempt} tentatives : {item}")
+            self.metrics.drop(self.site, item)
+            return False
+        due = time.monotonic() + backoff_delay(attempt)
+        with self.lock:
+            heapq.heappush(self.heap, (due, next(self.counter), attempt + 1, item))
+        self.metrics.add(self.site, "retried")
+        return True
+
+    def pop_due(self):
+        """Retourne (tentative, élément) dont l'échéance est passée, ou None."""
+        with self.lock:
+            if self.heap and self.heap[0][0] <= time.monotonic():
+                _, _, attempt, item = heapq.heappop(self.heap)
+                return attempt, item
+        return None
+
+    def seconds_until_next(self):
+        with self.lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - time.monotonic())
+
+    def __len__(self):
+        with self.lock:
+            return len(self.heap)
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par site : après `failure_threshold` échecs en `window` secondes, le site est mis
+    en pause pendant `cooldown` secondes, puis une seule requête de test est autorisée.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, site, failure_threshold=BREAKER_FAILURE_THRESHOLD, window=BREAKER_WINDOW,
+                 cooldown=BREAKER_COOLDOWN, metrics=METRICS):
+        self.site = site
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = []
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                print(f"🔌 [{self.site}] Test de reprise du site")
+                return True
+            return False
+
+    def wait(self, poll=1.0):
+        while not self.allow():
+            time.sleep(poll)
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print(f"✅ [{self.site}] Site de nouveau disponible, disjoncteur refermé")
+                self.metrics.add(self.site, "breaker_closed")
+            self.state = self.CLOSED
+            self.failures = []
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                self._open(now)
+                return
+            self.failures = [t for t in self.failures if now - t < self.window]
+            self.failures.append(now)
+            if self.state == self.CLOSED and len(self.failures) >= self.failure_threshold:
+                self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.failures = []
+        self.probe_in_flight = False
+        self.metrics.add(self.site, "breaker_opened")
+        print(f"⛔ [{self.site}] Trop d'erreurs, pause de {self.cooldown:.0f} s")
@@ -0,0 +1,263 @@
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# --- Configuration ---
+SCHEDULE_FRANCETRAVAIL_MINUTES = float(os.getenv("SCHEDULE_FRANCETRAVAIL_MINUTES", 15))
+SCHEDULE_FRESH_MINUTES = float(os.getenv("SCHEDULE_FRESH_MINUTES", 5))
+SCHEDULE_FRESH_PAGES = int(os.getenv("SCHEDULE_FRESH_PAGES", 5))
+SCHEDULE_DEEP_AT = os.getenv("SCHEDULE_DEEP_AT", "02:00")
+# Recouvrement de la fenêtre minCreationDate entre deux collectes France Travail
+SCHEDULE_FRANCETRAVAIL_OVERLAP_MINUTES = float(os.getenv("SCHEDULE_FRANCETRAVAIL_OVERLAP_MINUTES", 60))
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", 4))
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", 1))
+# Tentatives de génération des CVs d'une offre avant abandon
+CV_MAX_ATTEMPTS = int(os.getenv("CV_MAX_ATTEMPTS", 3))
+
+# Priorités : plus petit = plus frais = servi en premier quand plusieurs tâches attendent un créneau
+PRIORITY_FRESH = 0
+PRIORITY_API = 1
+PRIORITY_DEEP = 2
+
+
+def next_daily(at, now):
+    hour, minute = (int(part) for part in at.split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return candidate if candidate > now else candidate + timedelta(days=1)
+
+
+class Job:
+    """Tâche planifiée : toutes les `interval` secondes, ou chaque jour à `daily_at` (HH:MM)."""
+
+    def __init__(self, name, action, priority, interval=None, daily_at=None, run_at_start=True):
+        self.name = name
+        self.action = action
+        self.priority = priority
+        self.interval = interval
+        self.daily_at = daily_at
+        self.running = False
+        self.last_success = None
+        self.last_duration = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.next_run = time.time() if run_at_start else self.following(time.time())
+
+    def following(self, now):
+        if self.interval is not None:
+            return now + self.interval
+        return next_daily(self.daily_at, datetime.fromtimestamp(now)).timestamp()
+
+
+class Scheduler:
+    """
+    Lance les tâches dues dans des threads, au plus `max_concurrent` à la fois, par ordre de priorité.
+    Une tâche encore en cours à sa prochaine échéance n'est pas relancée : l'exécution est sautée.
+    """
+
+    def __init__(self, max_concurrent=SCHEDULER_MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.active = 0
+
+    def add(self, job):
+        self.jobs.append(job)
+        return job
+
+    def tick(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            due = sorted((job for job in self.jobs if job.next_run <= now), key=lambda j: (j.priority, j.next_run))
+            for job in due:
+                if job.running:
+                    job.skipped += 1
+                    job.next_run = job.following(now)
+                    print(f"⏭️ [{job.name}] Exécution précédente en cours, échéance sautée")
+                    continue
+                if self.active >= self.max_concurrent:
+                    # Pas de créneau libre : la tâche reste due et passera dès que possible, les plus fraîches d'abord
+                    continue
+                job.running = True
+                job.next_run = job.following(now)
+                self.active += 1
+                thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job.name}", daemon=True)
+                self.threads = [t for t in self.threads if t.is_alive()] + [thread]
+                thread.start()
+
+    def _run(self, job):
+        started = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        print(f"▶️ [{job.name}] Démarrage")
+        try:
+            job.action(job)
+            job.last_success = started
+            status = "terminé"
+        except Exception as e:
+            job.failures += 1
+            status = f"en erreur ({e})"
+        finally:
+            job.last_duration = time.perf_counter() - start
+            with self.lock:
+                job.runs += 1
+                job.running = False
+                self.active -= 1
+        next_run = datetime.fromtimestamp(job.next_run).strftime("%H:%M:%S")
+        print(f"⏹️ [{job.name}] {status} en {job.last_duration:.0f} s (prochaine exécution {next_run})")
+
+    def status(self):
+        with self.lock:
+            return [{"job": job.name, "running": job.running, "runs": job.runs, "failures": job.failures,
+                     "skipped": job.skipped, "lastDurationS": job.last_duration,
+                     "nextRun": datetime.fromtimestamp(job.next_run).isoformat()} for job in self.jobs]
+
+    def run_forever(self, poll=SCHEDULER_POLL_SECONDS):
+        while not self.stop_event.is_set():
+            self.tick()
+            self.stop_event.wait(poll)
+        print("⏳ Attente de la fin des tâches en cours...")
+        for thread in self.threads:
+            thread.join()
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+
+class CvTrigger:
+    """
+    Génère les CVs des offres arrivées depuis le démarrage du démon, dans un thread unique pour
+    respecter la limite de débit de Mistral. notify() est appelé à la fin de chaque collecte.
+    Chaque offre est marquée (`cvGeneratedAt`) une fois ses CVs enregistrés : pas de filigrane sur _id,
+    dont l'ordre ne suit pas celui des insertions concurrentes, et rien n'est perdu si la génération s'arrête.
+    """
+
+    def __init__(self, collection, stop_event, max_attempts=CV_MAX_ATTEMPTS):
+        self.collection = collection
+        self.stop_event = stop_event
+        self.max_attempts = max_attempts
+        self.pending = threading.Event()
+        # Seules les offres arrivées après le démarrage du démon sont traitées
+        self.since = datetime.now(timezone.utc)
+        self.thread = threading.Thread(target=self.run, name="cv-trigger", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def notify(self):
+        self.pending.set()
+
+    def run(self):
+        import cv
+        while not self.stop_event.is_set():
+            if not self.pending.wait(1):
+                continue
+            self.pending.clear()
+            offers = list(self.collection.find({
+                "cvGeneratedAt": None,
+                "dateInscriptionBase": {"$gte": self.since},
+                "cvAttempts": {"$not": {"$gte": self.max_attempts}},
+            }).sort("dateInscriptionBase", 1))
+            if not offers:
+                continue
+            try:
+                report_freshness(offers)
+                cv.process_offers(offers, on_result=self.mark)
+            except Exception as e:
+                print(f"❌ Erreur génération des CVs: {e}")
+
+    def mark(self, offer, ok):
+        # Une offre en échec reste à traiter jusqu'à max_attempts tentatives
+        update = {"$set": {"cvGeneratedAt": datetime.now(timezone.utc)}} if ok else {"$inc": {"cvAttempts": 1}}
+        self.collection.update_one({"_id": offer["_id"]}, update)
+
+
+def report_freshness(offers):
+    # Délai entre la publication sur le site et l'insertion en base
+    lags = sorted((offer["dateInscriptionBase"] - offer["datePublication"]).total_seconds()
+                  for offer in offers
+                  if isinstance(offer.get("datePublication"), datetime) and isinstance(offer.get("dateInscriptionBase"), datetime))
+    if lags:
+        print(f"🆕 {len(offers)} nouvelles offres, délai publication → base : médiane {lags[len(lags) // 2] / 60:.0f} min")
+    else:
+        print(f"🆕 {len(offers)} nouvelles offres")
+
+
+def build_jobs(scheduler, sources, pools, mongo_collection, on_new_offers, fresh_pages=SCHEDULE_FRESH_PAGES,
+               fresh_minutes=SCHEDULE_FRESH_MINUTES, francetravail_minutes=SCHEDULE_FRANCETRAVAIL_MINUTES,
+               deep_at=SCHEDULE_DEEP_AT, workers=None):
+    import index
+    workers = workers or index.LISTING_WORKERS
+
+    def francetravail(job):
+        min_date = None
+        if job.last_success is not None:
+            since = job.last_success - timedelta(minutes=SCHEDULE_FRANCETRAVAIL_OVERLAP_MINUTES)
+            min_date = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+        coverage = index.scrape_francetravail(index.FRANCETRAVAIL_CLIENT_ID, index.FRANCETRAVAIL_CLIENT_SECRET,
+                                              mongo_collection, min_creation_date=min_date)
+        on_new_offers()
+        # last_success n'avance pas tant qu'une nouvelle collecte peut combler un trou : la prochaine reprend
+        # depuis le dernier succès. Les offres qu'aucune facette n'atteint sont signalées sans bloquer la fenêtre.
+        if coverage is None:
+            raise RuntimeError("token France Travail indisponible")
+        if coverage["retryable"]:
+            raise RuntimeError("couverture France Travail incomplète (tranches à retenter)")
+        if coverage["unreachableOffers"]:
+            print(f"⚠️ [{job.name}] {coverage['unreachableOffers']} offres hors facettes, fenêtre avancée malgré tout")
+
+    def listing(source, start_page, end_page):
+        def action(job):
+            if source == "hellowork":
+                index.scrape_hellowork(start_page, end_page, index.MAX_JOBS_PER_PAGE, workers=workers, pool=pools[source])
+            else:
+                index.scrape_freework(start_page, end_page, workers=workers, pool=pools[source])
+            on_new_offers()
+        return action
+
+    if "francetravail" in sources:
+        scheduler.add(Job("francetravail", francetravail, PRIORITY_API, interval=francetravail_minutes * 60))
+    for source in ("hellowork", "freework"):
+        if source not in sources:
+            continue
+        scheduler.add(Job(f"{source}-pages-1-{fresh_pages}", listing(source, 1, fresh_pages), PRIORITY_FRESH,
+                          interval=fresh_minutes * 60))
+        scheduler.add(Job(f"{source}-deep", listing(source, fresh_pages + 1, index.END_PAGE), PRIORITY_DEEP,
+                          daily_at=deep_at, run_at_start=False))
+    return scheduler
+
+
+def run_daemon(sources=None, generate_cvs=True, max_concurrent=SCHEDULER_MAX_CONCURRENT, **schedule):
+    """Collecte en continu : navigateurs et connexions MongoDB restent ouverts d'une exécution à l'autre."""
+    import index
+    sources = sources or index.SOURCES
+    mongo_collection = index.init_mongodb(index.MONGODB_URI, index.DB_NAME, index.COLLECTION_NAME)
+    if mongo_collection is None:
+        print("❌ MongoDB non disponible, démon non démarré")
+        return
+    scheduler = Scheduler(max_concurrent)
+    pools = {source: index.DriverPool() for source in ("hellowork", "freework") if source in sources}
+    trigger = CvTrigger(mongo_collection, scheduler.stop_event).start() if generate_cvs else None
+    build_jobs(scheduler, sources, pools, mongo_collection, trigger.notify if trigger else (lambda: None), **schedule)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    for job in scheduler.jobs:
+        when = datetime.fromtimestamp(job.next_run).strftime("%d/%m %H:%M")
+        print(f"🗓️ {job.name}: {'toutes les %.0f min' % (job.interval / 60) if job.interval else 'chaque jour à ' + job.daily_at} (première exécution {when})")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Arrêt du démon demandé")
+        scheduler.stop()
+        for thread in scheduler.threads:
+            thread.join()
+    finally:
+        for pool in pools.values():
+            pool.quit_all()
+        print("✅ Démon arrêté")
@@ -0,0 +1,262 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from dotenv import load_dotenv
+
+from skills import fold
+
+load_dotenv()
+# --- Configuration ---
+SEARCH_HOST = os.getenv("SEARCH_HOST", "127.0.0.1")
+SEARCH_PORT = int(os.getenv("SEARCH_PORT", 8765))
+SEARCH_POLL_INTERVAL = float(os.getenv("SEARCH_POLL_INTERVAL", 30))
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Le titre compte plus que le profil, qui compte plus que la description
+FIELD_WEIGHTS = {"titre": 3, "profilRecherche": 2, "mission": 1}
+STORED_FIELDS = ("idOffre", "titre", "entreprise", "site", "typeContrat", "localisation", "datePublication", "lien")
+FILTER_FIELDS = ("site", "typeContrat", "localisation")
+
+STOPWORDS = set(fold(w) for w in """
+a au aux avec ce ces cette dans de des du elle en et eux il ils je la le les leur lui ma mais me meme mes moi
+mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous
+c d j l m n s t y ete etre avoir sont est etes sera seront ainsi afin chez entre vers sans sous tout tous toute
+toutes plus moins tres bien aussi comme dont
+""".split())
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+# Élisions : l'entreprise, d'expérience, qu'il
+ELISION_PATTERN = re.compile(r"\b(?:l|d|j|m|n|s|t|c|qu|jusqu|lorsqu|puisqu)['’]")
+
+
+def stem(token):
+    # Racinisation légère (pluriels et féminins courants), suffisante pour la recherche d'offres
+    if len(token) > 4:
+        for suffix in ("euses", "euse", "eurs", "aux", "es", "s", "x"):
+            if token.endswith(suffix):
+                if suffix == "aux":
+                    return token[:-3] + "al"
+                if suffix in ("euses", "euse"):
+                    return token[:-len(suffix)] + "eur"
+                if suffix == "eurs":
+                    return token[:-1]
+                return token[:-len(suffix)]
+        if token.endswith("e"):
+            return token[:-1]
+    return token
+
+
+def tokenize(text):
+    if not text or not isinstance(text, str):
+        return []
+    text = ELISION_PATTERN.sub(" ", fold(text))
+    return [stem(t) for t in TOKEN_PATTERN.findall(text) if t not in STOPWORDS]
+
+
+class OfferIndex:
+    """
+    Index inversé incrémental (BM25) sur titre / mission / profilRecherche.
+    Les postings et les colonnes de filtres sont des array.array, lus sans copie par numpy
+    au moment de la requête : le score d'un terme est calculé en une opération vectorisée.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = {}
+        self.docs = []
+        self.ids = {}
+        self.doc_lengths = array("f")
+        self.total_length = 0.0
+        self.dates = array("d")
+        # Filtres : chaque valeur distincte (repliée) reçoit un code
+        self.filter_values = {field: {} for field in FILTER_FIELDS}
+        self.filter_codes = {field: array("i") for field in FILTER_FIELDS}
+
+    def add(self, offer):
+        key = offer.get("idOffre") or str(offer.get("_id"))
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(offer.get(field)):
+                frequencies[token] = frequencies.get(token, 0) + weight
+        date = offer.get("datePublication")
+        with self.lock:
+            if key in self.ids:
+                return False
+            doc_id = len(self.docs)
+            self.ids[key] = doc_id
+            self.docs.append({field: offer.get(field) for field in STORED_FIELDS})
+            length = sum(frequencies.values())
+            self.doc_lengths.append(length)
+            self.total_length += length
+            # pymongo rend des dates naïves en UTC
+            self.dates.append(date.replace(tzinfo=date.tzinfo or timezone.utc).timestamp() if isinstance(date, datetime) else math.nan)
+            for field in FILTER_FIELDS:
+                values = self.filter_values[field]
+                value = fold(offer.get(field) or "")
+                self.filter_codes[field].append(values.setdefault(value, len(values)))
+            for token, tf in frequencies.items():
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = (array("i"), array("f"))
+                postings[0].append(doc_id)
+                postings[1].append(tf)
+        return True
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _filter_mask(self, count, site, type_contrat, localisation, since, until):
+        mask = np.ones(count, dtype=bool)
+        # site : égalité ; typeContrat / localisation : sous-chaîne ("paris" trouve "Paris (75)")
+        for field, value, exact in (("site", site, True), ("typeContrat", type_contrat, False), ("localisation", localisation, False)):
+            if not value:
+                continue
+            codes = [code for text, code in self.filter_values[field].items() if (text == value if exact else value in text)]
+            mask &= np.isin(np.frombuffer(self.filter_codes[field], dtype=np.int32, count=count), codes)
+        if since or until:
+            dates = np.frombuffer(self.dates, dtype=np.float64, count=count)
+            if since:
+                mask &= dates >= since.timestamp()
+            if until:
+                mask &= dates < until.timestamp()
+        return mask
+
+    def search(self, query, limit=20, site=None, type_contrat=None, localisation=None, since=None, until=None):
+        terms = set(tokenize(query))
+        site, type_contrat, localisation = (fold(v) if v else None for v in (site, type_contrat, localisation))
+        with self.lock:
+            count = len(self.docs)
+            if not terms or count == 0:
+                return []
+            lengths = np.frombuffer(self.doc_lengths, dtype=np.float32, count=count)
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (self.total_length / count or 1))
+            scores = np.zeros(count, dtype=np.float32)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                doc_ids = np.frombuffer(postings[0], dtype=np.int32)
+                tfs = np.frombuffer(postings[1], dtype=np.float32)
+                idf = math.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                # Un document n'apparaît qu'une fois par terme : l'indexation avancée suffit
+                scores[doc_ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norms[doc_ids])
+            if any((site, type_contrat, localisation, since, until)):
+                scores[~self._filter_mask(count, site, type_contrat, localisation, since, until)] = 0
+            matched = np.flatnonzero(scores)
+            if len(matched) > limit:
+                matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+            best = matched[np.argsort(-scores[matched], kind="stable")]
+            return [dict(self.docs[doc_id], score=round(float(scores[doc_id]), 4)) for doc_id in best]
+
+
+# --- Synchronisation avec MongoDB ---
+INDEX_PROJECTION = {field: 1 for field in STORED_FIELDS + tuple(FIELD_WEIGHTS)}
+
+
+def build_index(collection, index=None, batch_size=1000):
+    if index is None:
+        index = OfferIndex()
+    start = time.perf_counter()
+    last_id = None
+    for offer in collection.find({}, INDEX_PROJECTION, batch_size=batch_size).sort("_id", 1):
+        index.add(offer)
+        last_id = offer["_id"]
+    print(f"✅ Index de recherche construit : {len(index)} offres en {time.perf_counter() - start:.1f} s")
+    return index, last_id
+
+
+def follow_inserts(collection, index, last_id, stop_event, poll_interval=SEARCH_POLL_INTERVAL):
+    # Change stream si disponible (replica set / Atlas), sinon interrogation périodique par _id croissant
+    try:
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        with collection.watch(pipeline) as stream:
+            print("🔄 Suivi des nouvelles offres via change stream")
+            # Rattrapage des offres insérées pendant la construction de l'index
+            last_id = poll_inserts(collection, index, last_id)
+            while not stop_event.is_set():
+                change = stream.try_next()
+                if change is None:
+                    time.sleep(1)
+                    continue
+                index.add(change["fullDocument"])
+    except Exception as e:
+        print(f"⚠️ Change stream indisponible ({e}), interrogation toutes les {poll_interval:.0f} s")
+        while not stop_event.is_set():
+            last_id = poll_inserts(collection, index, last_id)
+            stop_event.wait(poll_interval)
+
+
+def poll_inserts(collection, index, last_id):
+    query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+    for offer in collection.find(query, INDEX_PROJECTION).sort("_id", 1):
+        index.add(offer)
+        last_id = offer["_id"]
+    return last_id
+
+
+# --- Service HTTP (lecture seule) ---
+def parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc) if value else None
+
+
+def make_handler(index):
+    class SearchHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == "/health":
+                return self.send_json(200, {"status": "ok", "offers": len(index)})
+            if url.path != "/search":
+                return self.send_json(404, {"error": "not found"})
+            try:
+                start = time.perf_counter()
+                results = index.search(
+                    params.get("q", ""),
+                    limit=min(int(params.get("limit", 20)), 200),
+                    site=params.get("site"),
+                    type_contrat=params.get("typeContrat"),
+                    localisation=params.get("localisation"),
+                    since=parse_day(params.get("since")),
+                    until=parse_day(params.get("until")),
+                )
+                took_ms = (time.perf_counter() - start) * 1000
+            except ValueError as e:
+                return self.send_json(400, {"error": str(e)})
+            self.send_json(200, {"took_ms": round(took_ms, 3), "count": len(results), "results": results})
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SearchHandler
+
+
+def serve(collection, host=SEARCH_HOST, port=SEARCH_PORT):
+    index, last_id = build_index(collection)
+    stop_event = threading.Event()
+    follower = threading.Thread(target=follow_inserts, args=(collection, index, last_id, stop_event), daemon=True)
+    follower.start()
+    server = ThreadingHTTPServer((host, port), make_handler(index))
+    print(f"🔎 Recherche disponible sur http://{host}:{port}/search?q=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Arrêt du service de recherche")
+    finally:
+        stop_event.set()
+        server.server_close()
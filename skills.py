@@ -0,0 +1,229 @@
+import math
+import re
+import unicodedata
+
+from pymongo import UpdateOne
+
+# --- Vocabulaire contrôlé : compétence canonique -> variantes rencontrées dans les offres et les CVs ---
+SKILL_VOCABULARY = {
+    # Langages
+    "python": ["python"],
+    "java": ["java", "j2ee", "jee"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript"],
+    "php": ["php"],
+    "c": ["langage c"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp"],
+    ".net": [".net", "dotnet", "asp.net"],
+    "go": ["golang"],
+    "rust": ["rust"],
+    "scala": ["scala"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "ruby": ["ruby", "rails"],
+    "r": ["langage r", "rstudio"],
+    "sql": ["sql", "pl/sql", "t-sql"],
+    "bash": ["bash", "shell", "scripting shell"],
+    "cobol": ["cobol"],
+    # Frameworks
+    "react": ["react", "reactjs", "react.js"],
+    "angular": ["angular", "angularjs"],
+    "vue.js": ["vue", "vuejs", "vue.js"],
+    "node.js": ["node", "nodejs", "node.js"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "symfony": ["symfony"],
+    "laravel": ["laravel"],
+    "html/css": ["html", "css", "html5", "css3"],
+    # Données
+    "postgresql": ["postgresql", "postgres"],
+    "mysql": ["mysql", "mariadb"],
+    "oracle": ["oracle"],
+    "mongodb": ["mongodb", "mongo"],
+    "elasticsearch": ["elasticsearch", "elastic"],
+    "spark": ["spark", "pyspark"],
+    "hadoop": ["hadoop"],
+    "kafka": ["kafka"],
+    "power bi": ["power bi", "powerbi"],
+    "tableau": ["tableau software"],
+    "machine learning": ["machine learning", "apprentissage automatique"],
+    "deep learning": ["deep learning", "tensorflow", "pytorch"],
+    "data science": ["data science", "data scientist"],
+    "etl": ["etl", "talend", "informatica"],
+    # Infra / DevOps
+    "docker": ["docker", "conteneurisation"],
+    "kubernetes": ["kubernetes", "k8s", "openshift"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"],
+    "linux": ["linux", "unix", "debian", "ubuntu", "red hat"],
+    "windows server": ["windows server", "active directory"],
+    "git": ["git", "github", "gitlab"],
+    "ci/cd": ["ci/cd", "jenkins", "integration continue", "gitlab ci"],
+    "terraform": ["terraform"],
+    "ansible": ["ansible"],
+    "devops": ["devops"],
+    "reseau": ["reseau", "reseaux", "tcp/ip", "cisco"],
+    "cybersecurite": ["cybersecurite", "securite informatique", "analyste soc", "pentest"],
+    # Méthodes / outils
+    "agile": ["agile", "agilite"],
+    "scrum": ["scrum"],
+    "jira": ["jira", "confluence"],
+    "sap": ["sap"],
+    "salesforce": ["salesforce"],
+    "excel": ["excel", "tableur"],
+    "pack office": ["pack office", "microsoft office", "microsoft word", "powerpoint"],
+    "api rest": ["api rest", "rest api", "restful", "api restful"],
+    "tests": ["tests unitaires", "tdd", "selenium", "cypress"],
+    # Métiers (offres France Travail / HelloWork)
+    "gestion de projet": ["gestion de projet", "chef de projet", "pilotage de projet"],
+    "management": ["management", "manager", "encadrement d'equipe", "encadrement"],
+    "comptabilite": ["comptabilite", "comptable", "bilan"],
+    "paie": ["paie"],
+    "ressources humaines": ["ressources humaines", "assistant rh", "charge rh", "gestionnaire rh", "recrutement"],
+    "commercial": ["commercial", "prospection", "negociation commerciale", "vente"],
+    "relation client": ["relation client", "service client", "accueil client", "conseiller client"],
+    "marketing": ["marketing", "seo", "community management"],
+    "logistique": ["logistique", "supply chain", "approvisionnement"],
+    "cariste": ["caces", "cariste", "chariot elevateur"],
+    "maintenance": ["maintenance", "depannage"],
+    "electricite": ["electricite", "electricien", "habilitation electrique"],
+    "soudure": ["soudure", "soudeur"],
+    "btp": ["btp", "chantier", "gros oeuvre", "maconnerie"],
+    "soins": ["soins", "aide-soignant", "infirmier", "infirmiere"],
+    "restauration": ["restauration", "cuisine", "cuisinier", "service en salle"],
+    "nettoyage": ["nettoyage", "entretien des locaux", "proprete"],
+    "conduite": ["permis b", "permis c", "chauffeur", "conducteur"],
+    "anglais": ["anglais", "english"],
+    "allemand": ["allemand"],
+    "espagnol": ["espagnol"],
+}
+
+SKILLS = sorted(SKILL_VOCABULARY)
+SKILL_INDEX = {skill: i for i, skill in enumerate(SKILLS)}
+
+
+def fold(text):
+    # Minuscules sans accents, pour comparer "Comptabilité" et "comptabilite"
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _alias_pattern(alias):
+    # Bornes "mot" qui tolèrent les caractères spéciaux (c++, c#, .net, ci/cd)
+    return rf"(?<![\w+#.]){re.escape(alias)}(?![\w+#])"
+
+
+# Une seule expression régulière : groupe nommé par compétence, variantes les plus longues en premier
+_ALIASES = sorted(((fold(a), s) for s, aliases in SKILL_VOCABULARY.items() for a in aliases), key=lambda x: -len(x[0]))
+_ALIAS_TO_SKILL = {alias: skill for alias, skill in _ALIASES}
+SKILL_PATTERN = re.compile("|".join(_alias_pattern(alias) for alias, _ in _ALIASES))
+
+
+def extract_skills(text):
+    """Compétences canoniques (avec répétitions) trouvées dans un texte libre."""
+    if not text or not isinstance(text, str):
+        return []
+    return [_ALIAS_TO_SKILL[m.group(0)] for m in SKILL_PATTERN.finditer(fold(text))]
+
+
+def extract_offer_skills(offer):
+    texts = [offer.get("titre"), offer.get("mission"), offer.get("profilRecherche")]
+    # Offres France Travail brutes : liste `competences`
+    texts.extend(c.get("libelle") for c in offer.get("competences") or [] if isinstance(c, dict))
+    found = set()
+    for text in texts:
+        found.update(extract_skills(text))
+    return sorted(found)
+
+
+def extract_cv_skills(cv):
+    texts = [s if isinstance(s, str) else s.get("name", "") for s in cv.get("skills") or [] if isinstance(s, (str, dict))]
+    basics = cv.get("basics") or {}
+    texts.extend([basics.get("label"), basics.get("summary")])
+    texts.extend(w.get("position") for w in cv.get("work") or [] if isinstance(w, dict))
+    found = set()
+    for text in texts:
+        found.update(extract_skills(text))
+    return sorted(found)
+
+
+def backfill_offer_skills(collection, batch_size=1000):
+    """Renseigne `skills` pour les offres déjà en base qui n'en ont pas."""
+    projection = {"titre": 1, "mission": 1, "profilRecherche": 1}
+    operations = []
+    updated = 0
+    for doc in collection.find({"skills": {"$exists": False}}, projection, batch_size=batch_size):
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"skills": extract_offer_skills(doc)}}))
+        if len(operations) >= batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    print(f"✅ Compétences renseignées pour {updated} offres")
+    return updated
+
+
+# --- Matrices TF-IDF et appariement vectorisé ---
+# numpy n'est importé que pour l'appariement, pas par les scrapers qui extraient les compétences.
+# Mémoire visée par bloc de scores (requêtes x corpus) lors de l'appariement
+MATCH_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def skill_matrix(skill_lists, idf=None):
+    """Matrice TF-IDF (documents x compétences) normalisée L2, et le vecteur idf utilisé."""
+    import numpy as np
+    rows, cols = [], []
+    for row, skills in enumerate(skill_lists):
+        for skill in skills:
+            col = SKILL_INDEX.get(skill)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    matrix = np.zeros((len(skill_lists), len(SKILLS)), dtype=np.float32)
+    np.add.at(matrix, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)), 1.0)
+    if idf is None:
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1 + len(skill_lists)) / (1 + document_frequency)).astype(np.float32) + 1.0
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, idf
+
+
+def top_k_matches(query_matrix, corpus_matrix, k=5, chunk_size=None):
+    """Pour chaque ligne de query_matrix, les k lignes de corpus_matrix au meilleur cosinus : (indices, scores)."""
+    import numpy as np
+    k = min(k, corpus_matrix.shape[0])
+    if chunk_size is None:
+        # Bloc float32 et sa copie négée pour argpartition : environ MATCH_BLOCK_BYTES au total
+        chunk_size = max(1, MATCH_BLOCK_BYTES // (2 * 4 * max(1, corpus_matrix.shape[0])))
+    indices = np.zeros((query_matrix.shape[0], k), dtype=np.int64)
+    scores = np.zeros((query_matrix.shape[0], k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    corpus_t = np.ascontiguousarray(corpus_matrix.T)
+    # Par blocs pour borner la mémoire (bloc x corpus)
+    for start in range(0, query_matrix.shape[0], chunk_size):
+        block = query_matrix[start:start + chunk_size] @ corpus_t
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        indices[start:start + chunk_size] = np.take_along_axis(best, order, axis=1)
+        scores[start:start + chunk_size] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, scores
+
+
+def match_cvs_to_offers(cvs, offers, k=5):
+    """Score tous les CVs contre toutes les offres en une passe ; retourne [(cv, [(offre, score), ...]), ...]."""
+    offer_skills = [offer.get("skills") or extract_offer_skills(offer) for offer in offers]
+    offer_matrix, idf = skill_matrix(offer_skills)
+    cv_matrix, _ = skill_matrix([extract_cv_skills(cv) for cv in cvs], idf)
+    indices, scores = top_k_matches(cv_matrix, offer_matrix, k)
+    results = []
+    for i, cv in enumerate(cvs):
+        matches = [(offers[j], float(score)) for j, score in zip(indices[i], scores[i]) if score > 0 and not math.isnan(score)]
+        results.append((cv, matches))
+    return results